@@ -6,13 +6,25 @@
 
 import sys
 import os
+import io
+import fcntl
 import shutil
+import subprocess
+import tempfile
+import time
+import threading
+import hashlib
+import mmap
+from abc import ABC, abstractmethod
+from operator import itemgetter
 import tarfile
-import gzip
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Iterable, Iterator, BinaryIO, Callable, ContextManager, Union
 from pathlib import Path
 import json
+import orjson
 
 # 添加项目根目录到路径
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -23,6 +35,352 @@ setup_environment()
 from shared.utils import setup_logging, parse_arguments, format_timestamp, exit_with_error, exit_with_success
 from shared.database_client import DatabaseClient
 
+# 可选依赖：python-isal 提供 ISA-L 加速的 gzip 实现，接口与标准库一致
+try:
+    from isal import igzip as _gzip
+    from isal import igzip_threaded as _gzip_threaded
+except ImportError:
+    import gzip as _gzip
+    _gzip_threaded = None
+
+# 日志归档文件名及大块拷贝缓冲区（tarfile 默认仅 16 KiB）
+LOGS_ARCHIVE_NAME = 'logs.tar.gz'
+# 增量备份使用的脚本内容哈希缓存（位于备份根目录）
+FILES_CACHE_NAME = '.files_cache.json'
+COPY_BUFFER_SIZE = 2 * 1024 * 1024
+# 后台删除中的目录后缀
+DELETING_SUFFIX = '.deleting'
+# 归档模式下导出文件在内存中暂存的上限，超过后转存临时文件
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+# 备份归档编解码器：归档后缀、识别用后缀及默认压缩级别
+# （备份内容多为文本，gzip 默认 9 级收益很小，低级别可大幅降低 CPU 开销）
+COMPRESS_CODEC_SUFFIXES = {'gzip': '.tar.gz', 'zstd': '.tar.zst', 'none': '.tar'}
+ARCHIVE_SUFFIXES = {'.tar.gz': 'gzip', '.tgz': 'gzip', '.tar.zst': 'zstd', '.tar': 'none'}
+DEFAULT_COMPRESS_LEVELS = {'gzip': 1, 'zstd': 3}
+# 不超过该大小的文件通过 mmap 直接读取页缓存来哈希/拷贝；Windows 上大块映射易造成地址空间碎片，不启用
+MMAP_MAX_SIZE = 256 * 1024 * 1024
+USE_MMAP = os.name != 'nt'
+# posix_fadvise 仅在 POSIX 平台可用
+HAS_FADVISE = hasattr(os, 'posix_fadvise')
+# Linux FICLONE ioctl（_IOW(0x94, 9, int)），用于写时复制文件系统上的 reflink 拷贝
+FICLONE = 0x40049409
+
+
+def _copy_file(src: str, dst: str, reflink: bool = False) -> None:
+    """
+    拷贝单个文件并保留元数据（等价于 shutil.copy2）
+    
+    reflink 为 True 时先尝试 FICLONE（btrfs / XFS reflink 等写时复制文件系统上只复制元数据），
+    失败（跨文件系统、不支持等）时：不超过 MMAP_MAX_SIZE 的文件映射后一次写出，
+    更大的文件使用 os.sendfile 内核零拷贝。
+    """
+    with open(src, 'rb') as f_in, open(dst, 'wb') as f_out, _sequential_read(f_in.fileno()):
+        if not (reflink and _reflink(f_in.fileno(), f_out.fileno())):
+            size = os.fstat(f_in.fileno()).st_size
+            if USE_MMAP and 0 < size <= MMAP_MAX_SIZE:
+                _mmap_copy(f_in.fileno(), f_out.fileno(), size)
+            else:
+                _sendfile_copy(f_in, f_out)
+    shutil.copystat(src, dst)
+
+
+def _fadvise(fd: int, advice: int) -> None:
+    """posix_fadvise 只是提示，不支持的文件类型（管道等）直接忽略"""
+    try:
+        os.posix_fadvise(fd, 0, 0, advice)
+    except OSError:
+        pass
+
+
+@contextmanager
+def _sequential_read(fd: int) -> Iterator[None]:
+    """
+    顺序读取源文件：读前提示内核加大预读，读完后丢弃其页缓存
+    
+    备份的脚本和日志只读一次，留在页缓存里只会挤掉其他进程的热数据。
+    """
+    if not HAS_FADVISE:
+        yield
+        return
+    _fadvise(fd, os.POSIX_FADV_SEQUENTIAL)
+    try:
+        yield
+    finally:
+        _fadvise(fd, os.POSIX_FADV_DONTNEED)
+
+
+def _drop_page_cache(path: str) -> None:
+    """
+    写完的备份归档短期内不会再读，提示内核释放其页缓存
+    
+    不强制落盘：干净页立即释放，脏页由内核按常规回写，不阻塞备份流程。
+    """
+    if not HAS_FADVISE:
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        _fadvise(fd, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def _tar_add_file(tar: tarfile.TarFile, src: str, arcname: str) -> None:
+    """将单个文件加入 tar（等价于 tar.add），普通文件以顺序读取方式打开"""
+    tarinfo = tar.gettarinfo(src, arcname)
+    if not tarinfo.isreg():
+        tar.addfile(tarinfo)
+        return
+    with open(src, 'rb') as f, _sequential_read(f.fileno()):
+        tar.addfile(tarinfo, f)
+
+
+def _reflink(src_fd: int, dst_fd: int) -> bool:
+    """通过 FICLONE ioctl 共享数据块，返回是否成功"""
+    try:
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+        return True
+    except OSError:
+        return False
+
+
+def _mmap_copy(src_fd: int, dst_fd: int, size: int) -> None:
+    """将源文件映射到内存后直接写出，省去逐块读入用户缓冲区的拷贝"""
+    with mmap.mmap(src_fd, 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            offset = 0
+            while offset < size:
+                offset += os.write(dst_fd, view[offset:])
+        finally:
+            view.release()
+
+
+def _sendfile_copy(f_in: BinaryIO, f_out: BinaryIO) -> None:
+    """使用 os.sendfile 拷贝文件内容，不支持时回退到普通缓冲拷贝"""
+    size = os.fstat(f_in.fileno()).st_size
+    offset = 0
+    try:
+        while offset < size:
+            sent = os.sendfile(f_out.fileno(), f_in.fileno(), offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+    except (AttributeError, OSError):
+        # 平台或文件系统不支持 sendfile，从已写入位置继续普通拷贝
+        f_in.seek(offset)
+        f_out.seek(offset)
+        shutil.copyfileobj(f_in, f_out, COPY_BUFFER_SIZE)
+
+
+def _write_jsonl(f: BinaryIO, rows: Iterable[Dict[str, Any]]) -> int:
+    """以 JSON Lines 格式逐行写出记录（每行一个 JSON 对象），返回写出的记录数"""
+    count = 0
+    for row in rows:
+        f.write(orjson.dumps(row, default=str))
+        f.write(b'\n')
+        count += 1
+    return count
+
+
+def _archive_suffix(name: str) -> Optional[str]:
+    """返回备份归档文件名的后缀（如 .tar.gz），不是归档时返回 None"""
+    return next((suffix for suffix in ARCHIVE_SUFFIXES if name.endswith(suffix)), None)
+
+
+def _walk_files(root: Union[str, Path], suffix: Optional[str] = None,
+                cutoff_ns: Optional[int] = None) -> Iterator[Tuple[str, os.stat_result]]:
+    """
+    使用 os.scandir 显式栈递归遍历文件，每个文件只 stat 一次
+    
+    Args:
+        root: 遍历根目录
+        suffix: 只返回以此结尾的文件名，None 表示全部
+        cutoff_ns: 只返回 mtime 晚于该时间（纳秒）的文件，None 表示不过滤
+        
+    Yields:
+        (文件路径, stat 结果)
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                    continue
+                if suffix is not None and not entry.name.endswith(suffix):
+                    continue
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+                if cutoff_ns is None or st.st_mtime_ns > cutoff_ns:
+                    yield entry.path, st
+
+
+def _dir_size(path: Path) -> int:
+    """统计目录总大小"""
+    return sum(st.st_size for _, st in _walk_files(path))
+
+
+def _file_digest(path: str) -> str:
+    """计算文件内容哈希（blake2b 64位摘要，仅用于变更检测）"""
+    digest = hashlib.blake2b(digest_size=8)
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if USE_MMAP and 0 < size <= MMAP_MAX_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                digest.update(mm)
+        else:
+            for chunk in iter(lambda: f.read(COPY_BUFFER_SIZE), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _is_safe_relative_path(relative_path: str) -> bool:
+    """归档成员路径必须是不会越出目标目录的相对路径"""
+    normalized = os.path.normpath(relative_path)
+    return not (os.path.isabs(normalized) or normalized == '..' or normalized.startswith('..' + os.sep))
+
+
+def _extract_member(tar: tarfile.TarFile, member: tarfile.TarInfo, relative_path: str, target_dir: str) -> None:
+    """将归档成员以 relative_path 为路径解压到 target_dir 下（保留权限和修改时间）"""
+    member.name = relative_path
+    tar.extract(member, target_dir, set_attrs=True)
+
+
+def _extract_logs_archive(archive: Union[str, BinaryIO], logs_dir: str) -> List[str]:
+    """解压 logs.tar.gz（路径或文件对象）到日志目录，返回恢复的文件列表"""
+    restored_files = []
+    os.makedirs(logs_dir, exist_ok=True)
+    with _gzip.open(archive, 'rb') as gz_in, \
+            io.BufferedReader(gz_in, buffer_size=COPY_BUFFER_SIZE) as buffered_in:
+        with tarfile.open(fileobj=buffered_in, mode='r|', copybufsize=COPY_BUFFER_SIZE) as tar:
+            for member in tar:
+                if member.isfile() and _is_safe_relative_path(member.name):
+                    tar.extract(member, logs_dir)
+                    restored_files.append(member.name)
+    return restored_files
+
+
+def _gunzip_file(source: Union[str, BinaryIO], target_file: str) -> None:
+    """解压单个 .gz 文件（路径或文件对象）到 target_file"""
+    os.makedirs(os.path.dirname(target_file), exist_ok=True)
+    with _gzip.open(source, 'rb') as gz_in, \
+            io.BufferedReader(gz_in, buffer_size=COPY_BUFFER_SIZE) as f_in:
+        with open(target_file, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out, COPY_BUFFER_SIZE)
+
+
+def _database_restore_result() -> Dict[str, Any]:
+    """数据库组件恢复结果的初始结构"""
+    return {
+        'status': 'completed',
+        'note': '数据库元数据已导出，请手动检查和导入',
+        'files': []
+    }
+
+
+def _json_records_item(name: str, f: BinaryIO) -> Dict[str, Any]:
+    """
+    解析导出的数据库文件并统计记录数
+    
+    .jsonl 文件逐行解析，内存占用与文件大小无关；旧版备份的 .json 数组整体解析。
+    """
+    try:
+        if name.endswith('.jsonl'):
+            records = 0
+            for line in f:
+                if line.strip():
+                    orjson.loads(line)
+                    records += 1
+            return {'file': name, 'records': records}
+        data = orjson.loads(f.read())
+        return {'file': name, 'records': len(data) if isinstance(data, list) else 1}
+    except Exception as e:
+        return {'file': name, 'error': str(e)}
+
+
+class _BackupTarget(ABC):
+    """备份输出端：组件通过它写出文件，无需关心备份是目录还是归档"""
+    
+    @abstractmethod
+    def add_files(self, component: str, files: List[Tuple[str, str]]) -> None:
+        """写入组件文件，files 为 (源文件路径, 组件内相对路径) 列表"""
+    
+    @abstractmethod
+    def add_logs(self, files: List[Tuple[str, str]]) -> None:
+        """写入日志文件"""
+    
+    @abstractmethod
+    def open_file(self, name: str) -> ContextManager[BinaryIO]:
+        """打开备份内相对路径为 name 的文件用于写入"""
+
+
+class _DirectoryTarget(_BackupTarget):
+    """目录形式的备份输出（未启用压缩时使用）"""
+    
+    def __init__(self, root: Path, copy_files: Callable[[List[Tuple[str, str]]], None], compress_level: int):
+        self.root = root
+        self.copy_files = copy_files
+        self.compress_level = compress_level
+    
+    def add_files(self, component: str, files: List[Tuple[str, str]]) -> None:
+        component_root = os.path.join(self.root, component)
+        self.copy_files([(src, os.path.join(component_root, relative_path)) for src, relative_path in files])
+    
+    def add_logs(self, files: List[Tuple[str, str]]) -> None:
+        """将日志文件打包为单个 logs.tar.gz，避免逐文件压缩的开销"""
+        logs_dir = self.root / 'logs'
+        logs_dir.mkdir(parents=True, exist_ok=True)
+        # GzipFile 本身不缓冲写入，套一层 2 MiB 缓冲让 deflate 每次处理大块数据
+        with _gzip.open(logs_dir / LOGS_ARCHIVE_NAME, 'wb', compresslevel=self.compress_level) as gz_out, \
+                io.BufferedWriter(gz_out, buffer_size=COPY_BUFFER_SIZE) as buffered_out:
+            with tarfile.open(fileobj=buffered_out, mode='w|', copybufsize=COPY_BUFFER_SIZE) as archive:
+                for src, relative_path in files:
+                    _tar_add_file(archive, src, relative_path)
+    
+    @contextmanager
+    def open_file(self, name: str) -> Iterator[BinaryIO]:
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            yield f
+
+
+class _ArchiveTarget(_BackupTarget):
+    """
+    直接写入 tar 归档流的备份输出，组件文件以 <arcroot>/<相对路径> 成员写入
+    
+    各组件并发执行，对 tar 的写入由锁串行化；数据库导出先写入各自的暂存文件，互不阻塞。
+    """
+    
+    def __init__(self, tar: tarfile.TarFile, arcroot: str):
+        self.tar = tar
+        self.arcroot = arcroot
+        self.lock = threading.Lock()
+    
+    def add_files(self, component: str, files: List[Tuple[str, str]]) -> None:
+        for src, relative_path in files:
+            with self.lock:
+                _tar_add_file(self.tar, src, f"{self.arcroot}/{component}/{relative_path}")
+    
+    def add_logs(self, files: List[Tuple[str, str]]) -> None:
+        # 外层归档已经压缩，日志以原始文件写入即可
+        self.add_files('logs', files)
+    
+    @contextmanager
+    def open_file(self, name: str) -> Iterator[BinaryIO]:
+        # tar 成员头需要预先知道大小，先写入内存（超限时落到临时文件）再整体加入归档
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as f:
+            yield f
+            tarinfo = tarfile.TarInfo(f"{self.arcroot}/{name}")
+            tarinfo.size = f.tell()
+            tarinfo.mtime = int(time.time())
+            tarinfo.mode = 0o644
+            f.seek(0)
+            with self.lock:
+                self.tar.addfile(tarinfo, f)
+
+
 class BackupProcessor:
     """备份处理器"""
     
@@ -31,6 +389,7 @@ class BackupProcessor:
         self.db_client = DatabaseClient()
         self.backup_base_dir = Path(backup_base_dir)
         self.backup_base_dir.mkdir(parents=True, exist_ok=True)
+        self.files_cache_path = self.backup_base_dir / FILES_CACHE_NAME
         
         # 备份配置（使用智能配置加载器）
         self.config = {
@@ -38,8 +397,29 @@ class BackupProcessor:
             'logs_dir': config.get('LOGS_DIR', '/app/logs'),
             'backup_dir': config.get('BACKUP_DIR', str(self.backup_base_dir)),
             'retention_days': int(config.get('BACKUP_RETENTION_DAYS', 30)),
-            'compress': config.get('BACKUP_COMPRESS', 'true').lower() == 'true'
+            'compress': config.get('BACKUP_COMPRESS', 'true').lower() == 'true',
+            'compress_codec': config.get('BACKUP_COMPRESS_CODEC', 'gzip').lower(),
+            'compress_level': int(config.get('BACKUP_COMPRESS_LEVEL') or 0) or None,
+            'copy_workers': int(config.get('BACKUP_COPY_WORKERS', min(32, (os.cpu_count() or 1) * 4)))
         }
+        
+        if self.config['compress_codec'] not in COMPRESS_CODEC_SUFFIXES:
+            self.logger.warning(f"未知的压缩格式 {self.config['compress_codec']}，使用 gzip")
+            self.config['compress_codec'] = 'gzip'
+        
+        # 压缩交给外部 pigz（多线程 gzip）/ gzip / zstd 进程，不可用时回退到 Python gzip
+        self.gzip_command = shutil.which('pigz') or shutil.which('gzip')
+        self.zstd_command = shutil.which('zstd')
+        
+        # 备份目录所在文件系统是否支持 reflink，探测一次避免每个文件都尝试失败
+        self.reflink_supported = self._probe_reflink()
+        
+        # 后台删除过期/失败的备份目录，避免大量 unlink 阻塞备份返回
+        self._delete_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='backup-delete')
+    
+    def close(self) -> None:
+        """关闭后台删除线程池（已提交的删除任务仍会在进程退出前完成）"""
+        self._delete_pool.shutdown(wait=False)
     
     def create_full_backup(self) -> Dict[str, Any]:
         """
@@ -48,44 +428,39 @@ class BackupProcessor:
         Returns:
             备份操作结果
         """
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_name = f"full_backup_{timestamp}"
+        # 同一次备份只取一次当前时间，备份名、时间戳均由其派生
+        now = datetime.now()
+        backup_name = f"full_backup_{now.strftime('%Y%m%d_%H%M%S')}"
         backup_dir = self.backup_base_dir / backup_name
         
         self.logger.info(f"开始创建完整备份: {backup_name}")
         
         try:
-            backup_dir.mkdir(parents=True, exist_ok=True)
-            
             result = {
                 'backup_name': backup_name,
                 'backup_path': str(backup_dir),
-                'timestamp': format_timestamp(),
+                'timestamp': format_timestamp(now),
                 'components': {}
             }
             
-            # 备份脚本文件
-            scripts_backup = self._backup_scripts(backup_dir / 'scripts')
-            result['components']['scripts'] = scripts_backup
-            
-            # 备份日志文件
-            logs_backup = self._backup_logs(backup_dir / 'logs')
-            result['components']['logs'] = logs_backup
-            
-            # 备份数据库元数据
-            db_backup = self._backup_database_metadata(backup_dir / 'database')
-            result['components']['database'] = db_backup
-            
-            # 创建备份信息文件
-            self._create_backup_info(backup_dir, result)
-            
-            # 压缩备份（如果启用）
-            if self.config['compress']:
-                compressed_path = self._compress_backup(backup_dir)
-                result['compressed_path'] = compressed_path
-                # 删除原始目录
-                shutil.rmtree(backup_dir)
-                result['backup_path'] = compressed_path
+            # 启用压缩时各组件直接写入归档流，不再先落地到备份目录
+            with self._open_backup_target(backup_dir) as (target, backup_path):
+                if self.config['compress']:
+                    result['compressed_path'] = backup_path
+                    result['backup_path'] = backup_path
+                
+                # 脚本、日志、数据库元数据三个组件互不依赖，并发执行
+                with ThreadPoolExecutor(max_workers=3, thread_name_prefix='backup-component') as executor:
+                    futures = {
+                        'scripts': executor.submit(self._backup_scripts, target),
+                        'logs': executor.submit(self._backup_logs, target),
+                        'database': executor.submit(self._backup_database_metadata, target)
+                    }
+                    for component, future in futures.items():
+                        result['components'][component] = future.result()
+                
+                # 创建备份信息文件
+                self._create_backup_info(target, result)
             
             # 清理旧备份
             self._cleanup_old_backups()
@@ -97,7 +472,7 @@ class BackupProcessor:
             self.logger.error(f"完整备份失败: {e}")
             # 清理失败的备份
             if backup_dir.exists():
-                shutil.rmtree(backup_dir, ignore_errors=True)
+                self._remove_tree_async(backup_dir)
             return {'error': str(e)}
     
     def create_incremental_backup(self, since_hours: int = 24) -> Dict[str, Any]:
@@ -110,45 +485,44 @@ class BackupProcessor:
         Returns:
             备份操作结果
         """
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_name = f"incremental_backup_{timestamp}"
+        now = datetime.now()
+        backup_name = f"incremental_backup_{now.strftime('%Y%m%d_%H%M%S')}"
         backup_dir = self.backup_base_dir / backup_name
         
         self.logger.info(f"开始创建增量备份: {backup_name}（最近{since_hours}小时）")
         
         try:
-            backup_dir.mkdir(parents=True, exist_ok=True)
-            cutoff_time = datetime.now() - timedelta(hours=since_hours)
+            cutoff_time = now - timedelta(hours=since_hours)
+            files_cache = self._load_files_cache()
             
             result = {
                 'backup_name': backup_name,
                 'backup_path': str(backup_dir),
-                'timestamp': format_timestamp(),
+                'timestamp': format_timestamp(now),
                 'since_hours': since_hours,
                 'components': {}
             }
             
-            # 备份最近修改的脚本
-            scripts_backup = self._backup_recent_scripts(backup_dir / 'scripts', cutoff_time)
-            result['components']['scripts'] = scripts_backup
-            
-            # 备份最近的日志
-            logs_backup = self._backup_recent_logs(backup_dir / 'logs', cutoff_time)
-            result['components']['logs'] = logs_backup
-            
-            # 备份最近的执行记录
-            db_backup = self._backup_recent_executions(backup_dir / 'database', cutoff_time)
-            result['components']['database'] = db_backup
-            
-            # 创建备份信息文件
-            self._create_backup_info(backup_dir, result)
+            with self._open_backup_target(backup_dir) as (target, backup_path):
+                if self.config['compress']:
+                    result['compressed_path'] = backup_path
+                    result['backup_path'] = backup_path
+                
+                # 最近修改的脚本、最近的日志、最近的执行记录并发备份
+                with ThreadPoolExecutor(max_workers=3, thread_name_prefix='backup-component') as executor:
+                    futures = {
+                        'scripts': executor.submit(self._backup_recent_scripts, target, cutoff_time, files_cache),
+                        'logs': executor.submit(self._backup_recent_logs, target, cutoff_time),
+                        'database': executor.submit(self._backup_recent_executions, target, cutoff_time)
+                    }
+                    for component, future in futures.items():
+                        result['components'][component] = future.result()
+                
+                # 创建备份信息文件
+                self._create_backup_info(target, result)
             
-            # 压缩备份
-            if self.config['compress']:
-                compressed_path = self._compress_backup(backup_dir)
-                result['compressed_path'] = compressed_path
-                shutil.rmtree(backup_dir)
-                result['backup_path'] = compressed_path
+            # 备份成功后才持久化哈希缓存，避免失败的备份导致后续漏备
+            self._save_files_cache(files_cache)
             
             self.logger.info(f"增量备份创建成功: {result['backup_path']}")
             return result
@@ -156,7 +530,7 @@ class BackupProcessor:
         except Exception as e:
             self.logger.error(f"增量备份失败: {e}")
             if backup_dir.exists():
-                shutil.rmtree(backup_dir, ignore_errors=True)
+                self._remove_tree_async(backup_dir)
             return {'error': str(e)}
     
     def restore_backup(self, backup_path: str, restore_components: Optional[List[str]] = None) -> Dict[str, Any]:
@@ -177,68 +551,110 @@ class BackupProcessor:
             return {'error': f'备份文件不存在: {backup_path}'}
         
         try:
-            # 创建临时解压目录
-            temp_dir = self.backup_base_dir / f"restore_temp_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            temp_dir.mkdir(parents=True, exist_ok=True)
+            components_to_restore = restore_components or ['scripts', 'logs', 'database']
             
-            # 解压备份文件
-            if backup_path.suffix == '.gz':
-                with tarfile.open(backup_path, 'r:gz') as tar:
-                    tar.extractall(temp_dir)
+            # 归档按后缀识别 .tar.gz / .tgz / .tar.zst / .tar，单次遍历直接解压到目标位置
+            archive_suffix = _archive_suffix(backup_path.name) if backup_path.is_file() else None
+            if archive_suffix:
+                backup_info, restored_components = self._restore_from_archive(
+                    backup_path, ARCHIVE_SUFFIXES[archive_suffix], components_to_restore)
+            elif backup_path.is_dir():
+                backup_info, restored_components = self._restore_from_directory(
+                    backup_path, components_to_restore)
             else:
-                # 假设是目录
-                shutil.copytree(backup_path, temp_dir / backup_path.name)
-            
-            # 找到解压后的备份目录
-            extracted_dirs = [d for d in temp_dir.iterdir() if d.is_dir()]
-            if not extracted_dirs:
                 return {'error': '备份文件格式无效'}
             
-            backup_dir = extracted_dirs[0]
-            
-            # 读取备份信息
-            backup_info_path = backup_dir / 'backup_info.json'
-            if backup_info_path.exists():
-                with open(backup_info_path, 'r', encoding='utf-8') as f:
-                    backup_info = json.load(f)
-            else:
-                backup_info = {}
-            
             result = {
                 'backup_path': str(backup_path),
                 'restore_timestamp': format_timestamp(),
-                'restored_components': {},
+                'restored_components': restored_components,
                 'backup_info': backup_info
             }
             
-            # 恢复各个组件
-            components_to_restore = restore_components or ['scripts', 'logs', 'database']
-            
-            if 'scripts' in components_to_restore and (backup_dir / 'scripts').exists():
-                scripts_result = self._restore_scripts(backup_dir / 'scripts')
-                result['restored_components']['scripts'] = scripts_result
-            
-            if 'logs' in components_to_restore and (backup_dir / 'logs').exists():
-                logs_result = self._restore_logs(backup_dir / 'logs')
-                result['restored_components']['logs'] = logs_result
-            
-            if 'database' in components_to_restore and (backup_dir / 'database').exists():
-                db_result = self._restore_database(backup_dir / 'database')
-                result['restored_components']['database'] = db_result
-            
-            # 清理临时目录
-            shutil.rmtree(temp_dir, ignore_errors=True)
-            
             self.logger.info("备份恢复完成")
             return result
             
         except Exception as e:
             self.logger.error(f"备份恢复失败: {e}")
-            # 清理临时目录
-            if 'temp_dir' in locals() and temp_dir.exists():
-                shutil.rmtree(temp_dir, ignore_errors=True)
             return {'error': str(e)}
     
+    def _restore_from_directory(self, backup_dir: Path,
+                                components: List[str]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """从目录形式的备份恢复，直接读取备份目录，无需复制到临时目录"""
+        backup_info = self._read_backup_info(backup_dir)
+        restored_components = {}
+        
+        if 'scripts' in components and (backup_dir / 'scripts').exists():
+            restored_components['scripts'] = self._restore_scripts(backup_dir / 'scripts')
+        
+        if 'logs' in components and (backup_dir / 'logs').exists():
+            restored_components['logs'] = self._restore_logs(backup_dir / 'logs')
+        
+        if 'database' in components and (backup_dir / 'database').exists():
+            restored_components['database'] = self._restore_database(backup_dir / 'database')
+        
+        return backup_info, restored_components
+    
+    def _restore_from_archive(self, archive_path: Path, codec: str,
+                              components: List[str]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        从归档恢复
+        
+        单次遍历归档成员，按 <备份名>/<组件>/ 前缀把文件直接解压到脚本目录、日志目录，
+        不再先整体解压到临时目录再逐个拷贝。
+        """
+        scripts_dir = self.config['scripts_dir']
+        logs_dir = self.config['logs_dir']
+        backup_info = {}
+        restored_components = {}
+        
+        with self._open_archive(archive_path, codec) as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                
+                parts = member.name.split('/', 2)
+                if len(parts) == 2 and parts[1] == 'backup_info.json':
+                    backup_info = orjson.loads(tar.extractfile(member).read())
+                    continue
+                if len(parts) != 3 or parts[1] not in components:
+                    continue
+                
+                component, relative_path = parts[1], parts[2]
+                if not _is_safe_relative_path(relative_path):
+                    self.logger.warning(f"跳过不安全的归档成员: {member.name}")
+                    continue
+                
+                if component == 'database':
+                    db_result = restored_components.setdefault('database', _database_restore_result())
+                    db_result['files'].append(
+                        _json_records_item(os.path.basename(relative_path), tar.extractfile(member)))
+                    continue
+                
+                component_result = restored_components.setdefault(
+                    component, {'status': 'completed', 'files_restored': 0, 'files': []})
+                restored_files = component_result['files']
+                
+                if component == 'scripts':
+                    _extract_member(tar, member, relative_path, scripts_dir)
+                    restored_files.append(relative_path)
+                elif relative_path == LOGS_ARCHIVE_NAME:
+                    restored_files.extend(_extract_logs_archive(tar.extractfile(member), logs_dir))
+                elif relative_path.endswith('.gz'):
+                    # 兼容旧格式：逐个 .gz 压缩的日志文件
+                    original_name = relative_path[:-len('.gz')]
+                    _gunzip_file(tar.extractfile(member), os.path.join(logs_dir, original_name))
+                    restored_files.append(original_name)
+                else:
+                    _extract_member(tar, member, relative_path, logs_dir)
+                    restored_files.append(relative_path)
+        
+        for component_result in restored_components.values():
+            if 'files_restored' in component_result:
+                component_result['files_restored'] = len(component_result['files'])
+        
+        return backup_info, restored_components
+    
     def list_backups(self) -> Dict[str, Any]:
         """
         列出所有备份
@@ -250,43 +666,36 @@ class BackupProcessor:
         
         # 扫描备份目录
         for item in self.backup_base_dir.iterdir():
-            if item.is_file() and item.suffix == '.gz':
+            archive_suffix = _archive_suffix(item.name)
+            if item.is_file() and archive_suffix:
                 # 压缩备份文件
+                st = item.stat()
                 backup_info = {
-                    'name': item.stem,
+                    'name': item.name[:-len(archive_suffix)],
                     'path': str(item),
                     'type': 'compressed',
-                    'size': item.stat().st_size,
-                    'created_time': datetime.fromtimestamp(item.stat().st_ctime),
-                    'modified_time': datetime.fromtimestamp(item.stat().st_mtime)
+                    'size': st.st_size,
+                    'created_time': datetime.fromtimestamp(st.st_ctime),
+                    'modified_time': datetime.fromtimestamp(st.st_mtime)
                 }
                 backups.append(backup_info)
             
-            elif item.is_dir() and ('backup_' in item.name):
+            elif item.is_dir() and ('backup_' in item.name) and not item.name.endswith(DELETING_SUFFIX):
                 # 目录形式的备份
-                backup_info_path = item / 'backup_info.json'
-                if backup_info_path.exists():
-                    try:
-                        with open(backup_info_path, 'r', encoding='utf-8') as f:
-                            info = json.load(f)
-                    except:
-                        info = {}
-                else:
-                    info = {}
-                
+                st = item.stat()
                 backup_info = {
                     'name': item.name,
                     'path': str(item),
                     'type': 'directory',
-                    'size': sum(f.stat().st_size for f in item.rglob('*') if f.is_file()),
-                    'created_time': datetime.fromtimestamp(item.stat().st_ctime),
-                    'modified_time': datetime.fromtimestamp(item.stat().st_mtime),
-                    'info': info
+                    'size': _dir_size(item),
+                    'created_time': datetime.fromtimestamp(st.st_ctime),
+                    'modified_time': datetime.fromtimestamp(st.st_mtime),
+                    'info': self._read_backup_info(item)
                 }
                 backups.append(backup_info)
         
         # 按创建时间排序
-        backups.sort(key=lambda x: x['created_time'], reverse=True)
+        backups.sort(key=itemgetter('created_time'), reverse=True)
         
         return {
             'total_backups': len(backups),
@@ -294,24 +703,27 @@ class BackupProcessor:
             'total_size': sum(b['size'] for b in backups)
         }
     
-    def _backup_scripts(self, backup_dir: Path) -> Dict[str, Any]:
+    def _read_backup_info(self, backup_dir: Path) -> Dict[str, Any]:
+        """读取目录备份中的 backup_info.json，不存在或损坏时返回空字典"""
+        try:
+            with open(backup_dir / 'backup_info.json', 'rb') as f:
+                return orjson.loads(f.read())
+        except (OSError, ValueError):
+            return {}
+    
+    def _backup_scripts(self, target: '_BackupTarget') -> Dict[str, Any]:
         """备份脚本文件"""
-        backup_dir.mkdir(parents=True, exist_ok=True)
-        scripts_dir = Path(self.config['scripts_dir'])
+        scripts_dir = self.config['scripts_dir']
         
-        if not scripts_dir.exists():
+        if not os.path.exists(scripts_dir):
             return {'status': 'skipped', 'reason': 'scripts directory not found'}
         
-        backed_up_files = []
-        
-        for script_file in scripts_dir.rglob('*'):
-            if script_file.is_file():
-                relative_path = script_file.relative_to(scripts_dir)
-                backup_file = backup_dir / relative_path
-                backup_file.parent.mkdir(parents=True, exist_ok=True)
-                
-                shutil.copy2(script_file, backup_file)
-                backed_up_files.append(str(relative_path))
+        files = [
+            (script_file, os.path.relpath(script_file, scripts_dir))
+            for script_file, _ in _walk_files(scripts_dir)
+        ]
+        target.add_files('scripts', files)
+        backed_up_files = [relative_path for _, relative_path in files]
         
         return {
             'status': 'completed',
@@ -319,28 +731,49 @@ class BackupProcessor:
             'files': backed_up_files
         }
     
-    def _backup_logs(self, backup_dir: Path) -> Dict[str, Any]:
+    def _copy_files(self, copy_pairs: List[Tuple[str, str]]) -> None:
+        """并发拷贝文件，目标目录预先统一创建"""
+        for parent in {os.path.dirname(dst) for _, dst in copy_pairs}:
+            os.makedirs(parent, exist_ok=True)
+        
+        reflink = self.reflink_supported
+        if len(copy_pairs) <= 1:
+            for src, dst in copy_pairs:
+                _copy_file(src, dst, reflink)
+            return
+        
+        workers = max(1, min(self.config['copy_workers'], len(copy_pairs)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # list() 触发迭代，使任一拷贝失败的异常在此抛出
+            list(executor.map(lambda pair: _copy_file(*pair, reflink), copy_pairs))
+    
+    def _probe_reflink(self) -> bool:
+        """探测备份目录所在文件系统是否支持 FICLONE"""
+        if not sys.platform.startswith('linux'):
+            return False
+        try:
+            with tempfile.TemporaryDirectory(dir=self.backup_base_dir) as probe_dir:
+                probe_src = os.path.join(probe_dir, 'src')
+                with open(probe_src, 'wb') as f:
+                    f.write(b'reflink probe')
+                with open(probe_src, 'rb') as f_in, open(os.path.join(probe_dir, 'dst'), 'wb') as f_out:
+                    return _reflink(f_in.fileno(), f_out.fileno())
+        except OSError:
+            return False
+    
+    def _backup_logs(self, target: '_BackupTarget') -> Dict[str, Any]:
         """备份日志文件"""
-        backup_dir.mkdir(parents=True, exist_ok=True)
-        logs_dir = Path(self.config['logs_dir'])
+        logs_dir = self.config['logs_dir']
         
-        if not logs_dir.exists():
+        if not os.path.exists(logs_dir):
             return {'status': 'skipped', 'reason': 'logs directory not found'}
         
-        backed_up_files = []
-        
-        for log_file in logs_dir.rglob('*.log'):
-            if log_file.is_file():
-                relative_path = log_file.relative_to(logs_dir)
-                backup_file = backup_dir / relative_path
-                backup_file.parent.mkdir(parents=True, exist_ok=True)
-                
-                # 压缩日志文件
-                with open(log_file, 'rb') as f_in:
-                    with gzip.open(f"{backup_file}.gz", 'wb') as f_out:
-                        shutil.copyfileobj(f_in, f_out)
-                
-                backed_up_files.append(str(relative_path))
+        files = [
+            (log_file, os.path.relpath(log_file, logs_dir))
+            for log_file, _ in _walk_files(logs_dir, suffix='.log')
+        ]
+        target.add_logs(files)
+        backed_up_files = [relative_path for _, relative_path in files]
         
         return {
             'status': 'completed',
@@ -349,95 +782,99 @@ class BackupProcessor:
             'compressed': True
         }
     
-    def _backup_database_metadata(self, backup_dir: Path) -> Dict[str, Any]:
+    def _backup_database_metadata(self, target: '_BackupTarget') -> Dict[str, Any]:
         """备份数据库元数据"""
-        backup_dir.mkdir(parents=True, exist_ok=True)
-        
         try:
+            # 逐行流式导出，避免一次性加载完整结果集
             # 导出脚本元数据
-            scripts = self.db_client.get_all_scripts()
-            with open(backup_dir / 'scripts_metadata.json', 'w', encoding='utf-8') as f:
-                json.dump(scripts, f, indent=2, ensure_ascii=False, default=str)
+            with target.open_file('database/scripts_metadata.jsonl') as f:
+                scripts_count = _write_jsonl(f, self.db_client.iter_all_scripts())
             
             # 导出执行历史（最近1000条）
-            executions = self.db_client.get_recent_executions(1000)
-            with open(backup_dir / 'executions_history.json', 'w', encoding='utf-8') as f:
-                json.dump(executions, f, indent=2, ensure_ascii=False, default=str)
+            with target.open_file('database/executions_history.jsonl') as f:
+                executions_count = _write_jsonl(f, self.db_client.iter_recent_executions(1000))
             
             # 导出定时任务
-            scheduled_tasks = self.db_client.get_scheduled_tasks()
-            with open(backup_dir / 'scheduled_tasks.json', 'w', encoding='utf-8') as f:
-                json.dump(scheduled_tasks, f, indent=2, ensure_ascii=False, default=str)
+            with target.open_file('database/scheduled_tasks.jsonl') as f:
+                tasks_count = _write_jsonl(f, self.db_client.iter_scheduled_tasks())
             
             # 导出用户信息
-            users = self.db_client.get_users()
-            with open(backup_dir / 'users.json', 'w', encoding='utf-8') as f:
-                json.dump(users, f, indent=2, ensure_ascii=False, default=str)
+            with target.open_file('database/users.jsonl') as f:
+                users_count = _write_jsonl(f, self.db_client.iter_users())
             
             return {
                 'status': 'completed',
                 'files_exported': 4,
-                'scripts_count': len(scripts),
-                'executions_count': len(executions),
-                'tasks_count': len(scheduled_tasks),
-                'users_count': len(users)
+                'scripts_count': scripts_count,
+                'executions_count': executions_count,
+                'tasks_count': tasks_count,
+                'users_count': users_count
             }
             
         except Exception as e:
             return {'status': 'failed', 'error': str(e)}
     
-    def _backup_recent_scripts(self, backup_dir: Path, cutoff_time: datetime) -> Dict[str, Any]:
-        """备份最近修改的脚本"""
-        backup_dir.mkdir(parents=True, exist_ok=True)
-        scripts_dir = Path(self.config['scripts_dir'])
+    def _backup_recent_scripts(self, target: '_BackupTarget', cutoff_time: datetime,
+                               files_cache: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        备份最近修改的脚本
         
-        if not scripts_dir.exists():
+        files_cache 记录上次备份时各文件的 size/mtime_ns/inode 及内容哈希：
+        元数据未变的文件直接跳过，仅时间戳变化而内容相同的文件也不再重复拷贝。
+        """
+        scripts_dir = self.config['scripts_dir']
+        
+        if not os.path.exists(scripts_dir):
             return {'status': 'skipped', 'reason': 'scripts directory not found'}
         
-        recent_files = []
+        if files_cache is None:
+            files_cache = {}
+        
+        files = []
+        unchanged_files = 0
+        cutoff_ns = int(cutoff_time.timestamp() * 1_000_000_000)
+        
+        for script_file, st in _walk_files(scripts_dir, cutoff_ns=cutoff_ns):
+            cached = files_cache.get(script_file)
+            signature = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'ino': st.st_ino}
+            
+            if cached and all(cached.get(k) == v for k, v in signature.items()):
+                unchanged_files += 1
+                continue
+            
+            digest = _file_digest(script_file)
+            files_cache[script_file] = dict(signature, digest=digest)
+            if cached and cached.get('digest') == digest:
+                unchanged_files += 1
+                continue
+            
+            files.append((script_file, os.path.relpath(script_file, scripts_dir)))
         
-        for script_file in scripts_dir.rglob('*'):
-            if script_file.is_file():
-                mtime = datetime.fromtimestamp(script_file.stat().st_mtime)
-                if mtime > cutoff_time:
-                    relative_path = script_file.relative_to(scripts_dir)
-                    backup_file = backup_dir / relative_path
-                    backup_file.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    shutil.copy2(script_file, backup_file)
-                    recent_files.append(str(relative_path))
+        target.add_files('scripts', files)
+        recent_files = [relative_path for _, relative_path in files]
         
         return {
             'status': 'completed',
             'files_backed_up': len(recent_files),
+            'files_unchanged': unchanged_files,
             'files': recent_files,
             'cutoff_time': format_timestamp(cutoff_time)
         }
     
-    def _backup_recent_logs(self, backup_dir: Path, cutoff_time: datetime) -> Dict[str, Any]:
+    def _backup_recent_logs(self, target: '_BackupTarget', cutoff_time: datetime) -> Dict[str, Any]:
         """备份最近的日志"""
-        backup_dir.mkdir(parents=True, exist_ok=True)
-        logs_dir = Path(self.config['logs_dir'])
+        logs_dir = self.config['logs_dir']
         
-        if not logs_dir.exists():
+        if not os.path.exists(logs_dir):
             return {'status': 'skipped', 'reason': 'logs directory not found'}
         
-        recent_logs = []
-        
-        for log_file in logs_dir.rglob('*.log'):
-            if log_file.is_file():
-                mtime = datetime.fromtimestamp(log_file.stat().st_mtime)
-                if mtime > cutoff_time:
-                    relative_path = log_file.relative_to(logs_dir)
-                    backup_file = backup_dir / relative_path
-                    backup_file.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    # 压缩日志文件
-                    with open(log_file, 'rb') as f_in:
-                        with gzip.open(f"{backup_file}.gz", 'wb') as f_out:
-                            shutil.copyfileobj(f_in, f_out)
-                    
-                    recent_logs.append(str(relative_path))
+        cutoff_ns = int(cutoff_time.timestamp() * 1_000_000_000)
+        files = [
+            (log_file, os.path.relpath(log_file, logs_dir))
+            for log_file, _ in _walk_files(logs_dir, suffix='.log', cutoff_ns=cutoff_ns)
+        ]
+        target.add_logs(files)
+        recent_logs = [relative_path for _, relative_path in files]
         
         return {
             'status': 'completed',
@@ -447,70 +884,192 @@ class BackupProcessor:
             'compressed': True
         }
     
-    def _backup_recent_executions(self, backup_dir: Path, cutoff_time: datetime) -> Dict[str, Any]:
+    def _backup_recent_executions(self, target: '_BackupTarget', cutoff_time: datetime) -> Dict[str, Any]:
         """备份最近的执行记录"""
-        backup_dir.mkdir(parents=True, exist_ok=True)
-        
         try:
-            # 获取最近的执行记录
-            all_executions = self.db_client.get_recent_executions(2000)
-            recent_executions = [
-                e for e in all_executions 
-                if e['start_time'] and e['start_time'] > cutoff_time
-            ]
-            
-            with open(backup_dir / 'recent_executions.json', 'w', encoding='utf-8') as f:
-                json.dump(recent_executions, f, indent=2, ensure_ascii=False, default=str)
+            # 获取最近的执行记录（时间过滤下推到 SQL）
+            recent_executions = self.db_client.iter_executions_since(cutoff_time)
+            with target.open_file('database/recent_executions.jsonl') as f:
+                executions_count = _write_jsonl(f, recent_executions)
             
             return {
                 'status': 'completed',
-                'executions_backed_up': len(recent_executions),
+                'executions_backed_up': executions_count,
                 'cutoff_time': format_timestamp(cutoff_time)
             }
             
         except Exception as e:
             return {'status': 'failed', 'error': str(e)}
     
-    def _create_backup_info(self, backup_dir: Path, backup_result: Dict[str, Any]) -> None:
+    def _load_files_cache(self) -> Dict[str, Dict[str, Any]]:
+        """读取脚本内容哈希缓存"""
+        try:
+            with open(self.files_cache_path, 'rb') as f:
+                return orjson.loads(f.read())
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_files_cache(self, files_cache: Dict[str, Dict[str, Any]]) -> None:
+        """原子写入脚本内容哈希缓存"""
+        temp_path = self.files_cache_path.with_suffix('.tmp')
+        with open(temp_path, 'wb') as f:
+            f.write(orjson.dumps(files_cache))
+        os.replace(temp_path, self.files_cache_path)
+    
+    def _create_backup_info(self, target: '_BackupTarget', backup_result: Dict[str, Any]) -> None:
         """创建备份信息文件"""
-        with open(backup_dir / 'backup_info.json', 'w', encoding='utf-8') as f:
-            json.dump(backup_result, f, indent=2, ensure_ascii=False, default=str)
+        with target.open_file('backup_info.json') as f:
+            f.write(orjson.dumps(backup_result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str))
+    
+    @contextmanager
+    def _open_backup_target(self, backup_dir: Path) -> Iterator[Tuple['_BackupTarget', str]]:
+        """
+        打开备份输出端
+        
+        启用压缩时返回直接写入 <backup_dir><后缀> 归档流的输出端，组件文件不会先落地到备份目录；
+        否则返回写入 backup_dir 目录的输出端。
+        
+        Yields:
+            (输出端, 最终备份路径)
+        """
+        if not self.config['compress']:
+            backup_dir.mkdir(parents=True, exist_ok=True)
+            # logs.tar.gz 固定为 gzip 格式，压缩级别与归档备份使用同一配置
+            level = self.config['compress_level'] or DEFAULT_COMPRESS_LEVELS['gzip']
+            yield _DirectoryTarget(backup_dir, self._copy_files, level), str(backup_dir)
+            return
+        
+        with self._create_archive(backup_dir) as (tar, archive_path):
+            yield _ArchiveTarget(tar, backup_dir.name), archive_path
+    
+    @contextmanager
+    def _create_archive(self, backup_dir: Path) -> Iterator[Tuple[tarfile.TarFile, str]]:
+        """
+        创建备份归档（格式由 BACKUP_COMPRESS_CODEC 指定：gzip/zstd/none）
+        
+        tar 流由 tarfile 生成，压缩交给外部 pigz/gzip/zstd 进程并行完成；
+        找不到压缩命令时回退到 ISA-L 或标准库 gzip。失败时删除不完整的归档。
+        """
+        codec = self.config['compress_codec']
+        if codec == 'zstd' and not self.zstd_command:
+            self.logger.warning("未找到 zstd 命令，回退为 gzip 压缩")
+            codec = 'gzip'
+        level = self.config['compress_level'] or DEFAULT_COMPRESS_LEVELS.get(codec)
+        archive_path = f"{backup_dir}{COMPRESS_CODEC_SUFFIXES[codec]}"
+        
+        if codec == 'zstd':
+            compress_command = [self.zstd_command, f'-{level}', '-T0', '-q', '-c']
+        elif codec == 'gzip' and self.gzip_command:
+            compress_command = [self.gzip_command, f'-{level}', '-c']
+        else:
+            compress_command = None
+        
+        try:
+            if compress_command:
+                with open(archive_path, 'wb') as f_out:
+                    process = subprocess.Popen(compress_command, stdin=subprocess.PIPE,
+                                               stdout=f_out, stderr=subprocess.PIPE)
+                    try:
+                        with tarfile.open(fileobj=process.stdin, mode='w|', dereference=True,
+                                          copybufsize=COPY_BUFFER_SIZE) as tar:
+                            yield tar, archive_path
+                    finally:
+                        process.stdin.close()
+                        stderr = process.stderr.read().decode(errors='replace')
+                        process.stderr.close()
+                        returncode = process.wait()
+                if returncode != 0:
+                    raise RuntimeError(f"{compress_command[0]} 压缩失败 (exit {returncode}): {stderr.strip()}")
+            elif codec == 'none':
+                with tarfile.open(archive_path, 'w', dereference=True, copybufsize=COPY_BUFFER_SIZE) as tar:
+                    yield tar, archive_path
+            elif _gzip_threaded is not None:
+                with _gzip_threaded.open(archive_path, 'wb', compresslevel=level,
+                                         threads=os.cpu_count() or 1) as gz_out:
+                    with tarfile.open(fileobj=gz_out, mode='w|', dereference=True,
+                                      copybufsize=COPY_BUFFER_SIZE) as tar:
+                        yield tar, archive_path
+            else:
+                with tarfile.open(archive_path, 'w:gz', compresslevel=level, dereference=True,
+                                  copybufsize=COPY_BUFFER_SIZE) as tar:
+                    yield tar, archive_path
+            _drop_page_cache(archive_path)
+        except BaseException:
+            if os.path.exists(archive_path):
+                os.remove(archive_path)
+            raise
     
-    def _compress_backup(self, backup_dir: Path) -> str:
-        """压缩备份目录"""
-        compressed_path = f"{backup_dir}.tar.gz"
+    @contextmanager
+    def _open_archive(self, archive_path: Path, codec: str) -> Iterator[tarfile.TarFile]:
+        """按编解码器打开备份归档用于读取，zstd 归档通过外部 zstd 进程流式解压"""
+        if codec != 'zstd':
+            with tarfile.open(archive_path, 'r:gz' if codec == 'gzip' else 'r:') as tar:
+                yield tar
+            return
         
-        with tarfile.open(compressed_path, 'w:gz') as tar:
-            tar.add(backup_dir, arcname=backup_dir.name)
+        if not self.zstd_command:
+            raise RuntimeError("恢复 .tar.zst 备份需要安装 zstd 命令")
         
-        return compressed_path
+        process = subprocess.Popen([self.zstd_command, '-dc', str(archive_path)],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            with tarfile.open(fileobj=process.stdout, mode='r|') as tar:
+                yield tar
+        finally:
+            process.stdout.close()
+            stderr = process.stderr.read().decode(errors='replace')
+            process.stderr.close()
+            returncode = process.wait()
+        if returncode != 0:
+            raise RuntimeError(f"zstd 解压失败 (exit {returncode}): {stderr.strip()}")
     
     def _cleanup_old_backups(self) -> None:
         """清理旧备份"""
-        cutoff_time = datetime.now() - timedelta(days=self.config['retention_days'])
+        cutoff_epoch = time.time() - self.config['retention_days'] * 86400
         
-        for item in self.backup_base_dir.iterdir():
-            if item.stat().st_ctime < cutoff_time.timestamp():
-                if item.is_file():
-                    item.unlink()
-                    self.logger.info(f"删除过期备份文件: {item}")
-                elif item.is_dir():
-                    shutil.rmtree(item)
-                    self.logger.info(f"删除过期备份目录: {item}")
+        with os.scandir(self.backup_base_dir) as it:
+            for entry in it:
+                # 跳过哈希缓存等内部文件
+                if entry.name.startswith('.'):
+                    continue
+                # 上次未删完的目录（如进程中途退出）直接重新提交删除
+                if entry.name.endswith(DELETING_SUFFIX):
+                    self._delete_pool.submit(shutil.rmtree, entry.path, ignore_errors=True)
+                    continue
+                if entry.stat(follow_symlinks=False).st_ctime >= cutoff_epoch:
+                    continue
+                if entry.is_file(follow_symlinks=False):
+                    os.unlink(entry.path)
+                    self.logger.info(f"删除过期备份文件: {entry.path}")
+                elif entry.is_dir(follow_symlinks=False):
+                    self._remove_tree_async(Path(entry.path))
+                    self.logger.info(f"删除过期备份目录: {entry.path}")
+    
+    def _remove_tree_async(self, path: Path) -> None:
+        """
+        后台删除目录
+        
+        先重命名为 *.deleting，使其立即从 list_backups 中消失，再交给后台线程递归删除。
+        """
+        deleting_path = path.with_name(path.name + DELETING_SUFFIX)
+        try:
+            os.rename(path, deleting_path)
+        except OSError:
+            deleting_path = path
+        self._delete_pool.submit(shutil.rmtree, deleting_path, ignore_errors=True)
     
     def _restore_scripts(self, scripts_backup_dir: Path) -> Dict[str, Any]:
         """恢复脚本文件"""
-        scripts_dir = Path(self.config['scripts_dir'])
+        scripts_dir = self.config['scripts_dir']
+        copy_pairs = []
         restored_files = []
         
-        for backup_file in scripts_backup_dir.rglob('*'):
-            if backup_file.is_file():
-                relative_path = backup_file.relative_to(scripts_backup_dir)
-                target_file = scripts_dir / relative_path
-                target_file.parent.mkdir(parents=True, exist_ok=True)
-                
-                shutil.copy2(backup_file, target_file)
-                restored_files.append(str(relative_path))
+        for backup_file, _ in _walk_files(scripts_backup_dir):
+            relative_path = os.path.relpath(backup_file, scripts_backup_dir)
+            copy_pairs.append((backup_file, os.path.join(scripts_dir, relative_path)))
+            restored_files.append(relative_path)
+        
+        self._copy_files(copy_pairs)
         
         return {
             'status': 'completed',
@@ -520,23 +1079,28 @@ class BackupProcessor:
     
     def _restore_logs(self, logs_backup_dir: Path) -> Dict[str, Any]:
         """恢复日志文件"""
-        logs_dir = Path(self.config['logs_dir'])
+        logs_dir = self.config['logs_dir']
         restored_files = []
         
-        for backup_file in logs_backup_dir.rglob('*.gz'):
-            if backup_file.is_file():
-                relative_path = backup_file.relative_to(logs_backup_dir)
+        logs_archive = os.path.join(logs_backup_dir, LOGS_ARCHIVE_NAME)
+        if os.path.isfile(logs_archive):
+            restored_files.extend(_extract_logs_archive(logs_archive, logs_dir))
+        
+        # 归档模式备份中的日志以原始文件保存（外层归档已压缩）
+        copy_pairs = []
+        for backup_file, _ in _walk_files(logs_backup_dir, suffix='.log'):
+            relative_path = os.path.relpath(backup_file, logs_backup_dir)
+            copy_pairs.append((backup_file, os.path.join(logs_dir, relative_path)))
+            restored_files.append(relative_path)
+        self._copy_files(copy_pairs)
+        
+        # 兼容旧格式：逐个 .gz 压缩的日志文件
+        for backup_file, _ in _walk_files(logs_backup_dir, suffix='.gz'):
+            if backup_file != logs_archive:
                 # 移除.gz扩展名
-                original_name = relative_path.with_suffix('').with_suffix('')
-                target_file = logs_dir / original_name
-                target_file.parent.mkdir(parents=True, exist_ok=True)
-                
-                # 解压缩日志文件
-                with gzip.open(backup_file, 'rb') as f_in:
-                    with open(target_file, 'wb') as f_out:
-                        shutil.copyfileobj(f_in, f_out)
-                
-                restored_files.append(str(original_name))
+                original_name = os.path.relpath(backup_file, logs_backup_dir)[:-len('.gz')]
+                _gunzip_file(backup_file, os.path.join(logs_dir, original_name))
+                restored_files.append(original_name)
         
         return {
             'status': 'completed',
@@ -546,29 +1110,15 @@ class BackupProcessor:
     
     def _restore_database(self, db_backup_dir: Path) -> Dict[str, Any]:
         """恢复数据库元数据"""
-        restored_items = []
+        result = _database_restore_result()
         
         # 这里只是示例，实际恢复数据库需要更谨慎的操作
-        for json_file in db_backup_dir.glob('*.json'):
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                restored_items.append({
-                    'file': json_file.name,
-                    'records': len(data) if isinstance(data, list) else 1
-                })
-            except Exception as e:
-                restored_items.append({
-                    'file': json_file.name,
-                    'error': str(e)
-                })
+        for name in sorted(os.listdir(db_backup_dir)):
+            if name.endswith(('.jsonl', '.json')):
+                with open(os.path.join(db_backup_dir, name), 'rb') as f:
+                    result['files'].append(_json_records_item(name, f))
         
-        return {
-            'status': 'completed',
-            'note': '数据库元数据已导出，请手动检查和导入',
-            'files': restored_items
-        }
+        return result
 
 def main():
     """主函数"""
@@ -649,6 +1199,8 @@ def main():
         
     except Exception as e:
         exit_with_error(f"备份操作失败: {e}")
+    finally:
+        processor.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
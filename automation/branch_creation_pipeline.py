@@ -10,9 +10,16 @@ import re
 import argparse
 import time
 import json
+import itertools
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from gitlab.exceptions import GitlabCreateError
+from typing import Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
 
 # 添加项目根目录到路径
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -22,10 +29,34 @@ from shared.gitlab_client import GitLabClient
 from shared.utils import setup_logging
 # from shared.file_lock import file_lock  # 移除锁机制
 
+# 一次请求同时取回以该分支为源/目标的开放MR，只返回需要的字段
+OPEN_MRS_GRAPHQL_QUERY = """
+query($fullPath: ID!, $branches: [String!], $includeTargeted: Boolean!) {
+  project(fullPath: $fullPath) {
+    outgoing: mergeRequests(state: opened, sourceBranches: $branches, first: 100) {
+      pageInfo { hasNextPage }
+      nodes { iid title author { name } sourceBranch targetBranch createdAt webUrl }
+    }
+    incoming: mergeRequests(state: opened, targetBranches: $branches, first: 100) @include(if: $includeTargeted) {
+      pageInfo { hasNextPage }
+      nodes { iid title author { name } sourceBranch targetBranch createdAt webUrl }
+    }
+  }
+}
+"""
+
 
 class BranchCreationPipeline:
     """分支创建流水线"""
 
+    # 固定实例属性，省去每个实例的 __dict__
+    __slots__ = (
+        'logger', 'gitlab_client',
+        'webhook_url', 'webhook_method', 'webhook_origin', 'webhook_custom_json',
+        'version_patterns', '_compiled_patterns', '_invalid_translation', '_project_cache',
+        '_webhook_session', '_webhook_custom_data', '_webhook_executor'
+    )
+
     def __init__(self, log_level: str = 'INFO', webhook_url: Optional[str] = None,
                  webhook_method: str = 'POST', webhook_origin: Optional[str] = None,
                  webhook_custom_json: Optional[str] = None):
@@ -48,19 +79,66 @@ class BranchCreationPipeline:
         self.webhook_origin = webhook_origin or os.getenv('WPS_WEBHOOK_ORIGIN', 'www.wps.cn')
         self.webhook_custom_json = webhook_custom_json or os.getenv('WPS_WEBHOOK_CUSTOM_JSON', '{}')
 
-        # 版本号正则表达式
+        # 自定义 JSON 只解析一次，每次通知直接合并
+        try:
+            self._webhook_custom_data = json.loads(self.webhook_custom_json)
+        except json.JSONDecodeError as e:
+            self.logger.warning(f"解析自定义 JSON 失败: {e}，使用空对象")
+            self._webhook_custom_data = {}
+
+        # Webhook 复用同一会话保持长连接；仅在建立连接失败时快速重试（请求尚未发出，
+        # 不会产生重复通知），POST 通知不按响应状态码重试
+        self._webhook_session = requests.Session()
+        webhook_adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=4,
+            max_retries=Retry(total=2, backoff_factor=0.2)
+        )
+        self._webhook_session.mount('https://', webhook_adapter)
+        self._webhook_session.mount('http://', webhook_adapter)
+        # Webhook 在后台线程发送，不阻塞分支创建结果返回
+        self._webhook_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='webhook')
+
+        # 版本号正则表达式（整串匹配，无需 ^/$ 锚点）
         self.version_patterns = {
-            'semantic': r'^v?\d+\.\d+\.\d+(-[a-zA-Z0-9]+)?$',  # v1.0.0, 2.1.3-beta
-            'major_minor': r'^v?\d+\.\d+(-[a-zA-Z0-9]+)?$',    # v1.0, 2.1-beta
-            'date_based': r'^\d{4}\.\d{2}\.\d{2}$',            # 2024.01.15
-            'custom': r'^[a-zA-Z0-9._-]+$'                    # 自定义格式
+            'semantic': r'v?\d+\.\d+\.\d+(-[a-zA-Z0-9]+)?',  # v1.0.0, 2.1.3-beta
+            'major_minor': r'v?\d+\.\d+(-[a-zA-Z0-9]+)?',    # v1.0, 2.1-beta
+            'date_based': r'\d{4}\.\d{2}\.\d{2}',            # 2024.01.15
+            'custom': r'[a-zA-Z0-9._-]+'                    # 自定义格式
         }
+        # 预编译正则，避免每次校验都查 re 模块缓存
+        self._compiled_patterns: Dict[str, Pattern] = {k: re.compile(v) for k, v in self.version_patterns.items()}
+
+        # 分支名中不允许的字符：translate 删除这些字符后长度变化即说明包含无效字符
+        self._invalid_translation = str.maketrans('', '', '<>:"|?* \t\n')
+
+        # 项目对象缓存（project_id -> Project），批量模式下避免重复请求
+        self._project_cache: Dict[str, any] = {}
 
         self.logger.info("GitLab分支创建流水线初始化完成")
         if self.webhook_url:
             self.logger.info(f"WPS Webhook已配置: {self.webhook_method} {self.webhook_url}")
             self.logger.info(f"Origin: {self.webhook_origin}")
 
+    def close(self) -> None:
+        """等待后台 Webhook 发送完成并释放连接"""
+        self._webhook_executor.shutdown(wait=True)
+        self._webhook_session.close()
+
+    def __enter__(self) -> 'BranchCreationPipeline':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _get_project(self, project_id: str):
+        """获取GitLab项目对象（按 project_id 缓存）"""
+        project = self._project_cache.get(project_id)
+        if project is None:
+            project = self.gitlab_client.gitlab.projects.get(project_id)
+            self._project_cache[project_id] = project
+        return project
+
     def check_open_merge_requests(self, project_id: str, source_branch: str,
                                  include_targeted: bool = True) -> Dict[str, any]:
         """
@@ -78,37 +156,13 @@ class BranchCreationPipeline:
 
         try:
             # 获取项目
-            project = self.gitlab_client.gitlab.projects.get(project_id)
+            project = self._get_project(project_id)
 
-            # 获取所有开放的MR
-            open_mrs = project.mergerequests.list(state='opened', all=True)
-
-            # 分析相关MR
-            source_mrs = []  # 源分支相关的MR（作为源分支）
-            targeted_mrs = []  # 目标分支相关的MR（作为目标分支）
-
-            for mr in open_mrs:
-                if mr.source_branch == source_branch:
-                    source_mrs.append({
-                        'iid': mr.iid,
-                        'title': mr.title,
-                        'author': mr.author['name'] if mr.author else 'Unknown',
-                        'target_branch': mr.target_branch,
-                        'created_at': mr.created_at,
-                        'web_url': mr.web_url,
-                        'type': 'outgoing'
-                    })
-
-                if include_targeted and mr.target_branch == source_branch:
-                    targeted_mrs.append({
-                        'iid': mr.iid,
-                        'title': mr.title,
-                        'author': mr.author['name'] if mr.author else 'Unknown',
-                        'source_branch': mr.source_branch,
-                        'created_at': mr.created_at,
-                        'web_url': mr.web_url,
-                        'type': 'incoming'
-                    })
+            # 优先通过 GraphQL 一次取回相关MR，失败时回退到 REST 接口
+            mr_lists = self._graphql_query_mrs(project.path_with_namespace, source_branch, include_targeted)
+            if mr_lists is None:
+                mr_lists = self._rest_query_mrs(project, source_branch, include_targeted)
+            source_mrs, targeted_mrs = mr_lists
 
             total_mrs = len(source_mrs) + len(targeted_mrs)
 
@@ -140,6 +194,147 @@ class BranchCreationPipeline:
                 'error': str(e)
             }
 
+    def _graphql_query_mrs(self, project_path: str, branch: str,
+                           include_targeted: bool) -> Optional[Tuple[List[Dict[str, any]], List[Dict[str, any]]]]:
+        """
+        通过 GitLab GraphQL 接口查询与分支相关的开放MR
+
+        Args:
+            project_path: 项目完整路径（namespace/project）
+            branch: 分支名称
+            include_targeted: 是否查询目标分支为该分支的MR
+
+        Returns:
+            (传出MR列表, 传入MR列表)；接口不可用、出错或结果超过一页时返回 None
+        """
+        config = self.gitlab_client.config
+        try:
+            response = self.gitlab_client.gitlab.session.post(
+                f"{config.url.rstrip('/')}/api/graphql",
+                json={
+                    'query': OPEN_MRS_GRAPHQL_QUERY,
+                    'variables': {
+                        'fullPath': project_path,
+                        'branches': [branch],
+                        'includeTargeted': include_targeted
+                    }
+                },
+                headers={'Authorization': f'Bearer {config.token}'},
+                timeout=config.timeout,
+                verify=config.verify_ssl
+            )
+            if response.status_code != 200:
+                self.logger.debug(f"GraphQL 查询MR失败 (HTTP {response.status_code})，回退到 REST")
+                return None
+
+            payload = response.json()
+            project = (payload.get('data') or {}).get('project')
+            if payload.get('errors') or not project:
+                self.logger.debug(f"GraphQL 查询MR返回错误: {payload.get('errors')}，回退到 REST")
+                return None
+
+            connections = [project['outgoing'], project.get('incoming') or {'nodes': []}]
+            if any(c.get('pageInfo', {}).get('hasNextPage') for c in connections):
+                self.logger.debug("GraphQL 查询MR结果超过一页，回退到 REST")
+                return None
+        except Exception as e:
+            self.logger.debug(f"GraphQL 查询MR异常: {e}，回退到 REST")
+            return None
+
+        def to_mr(node: Dict[str, any], direction: str) -> Dict[str, any]:
+            mr = {
+                'iid': int(node['iid']),
+                'title': node['title'],
+                'author': (node.get('author') or {}).get('name', 'Unknown')
+            }
+            if direction == 'outgoing':
+                mr['target_branch'] = node['targetBranch']
+            else:
+                mr['source_branch'] = node['sourceBranch']
+            mr.update(created_at=node['createdAt'], web_url=node['webUrl'], type=direction)
+            return mr
+
+        return ([to_mr(node, 'outgoing') for node in connections[0]['nodes']],
+                [to_mr(node, 'incoming') for node in connections[1]['nodes']])
+
+    def _rest_query_mrs(self, project, branch: str,
+                        include_targeted: bool) -> Tuple[List[Dict[str, any]], List[Dict[str, any]]]:
+        """
+        通过 REST 接口查询与分支相关的开放MR
+
+        Args:
+            project: GitLab项目对象
+            branch: 分支名称
+            include_targeted: 是否包含目标分支为该分支的MR
+
+        Returns:
+            (传出MR列表, 传入MR列表)
+        """
+        # 由服务端按分支过滤，只下载相关的MR
+        outgoing = self._list_open_mrs(project, source_branch=branch)
+        incoming = self._list_open_mrs(project, target_branch=branch) if include_targeted else []
+
+        source_mrs = [{
+            'iid': mr['iid'],
+            'title': mr['title'],
+            'author': (mr.get('author') or {}).get('name', 'Unknown'),
+            'target_branch': mr['target_branch'],
+            'created_at': mr['created_at'],
+            'web_url': mr['web_url'],
+            'type': 'outgoing'
+        } for mr in outgoing]  # 源分支相关的MR（作为源分支）
+
+        targeted_mrs = [{
+            'iid': mr['iid'],
+            'title': mr['title'],
+            'author': (mr.get('author') or {}).get('name', 'Unknown'),
+            'source_branch': mr['source_branch'],
+            'created_at': mr['created_at'],
+            'web_url': mr['web_url'],
+            'type': 'incoming'
+        } for mr in incoming]  # 目标分支相关的MR（作为目标分支）
+
+        return source_mrs, targeted_mrs
+
+    def _list_open_mrs(self, project, **filters) -> List[Dict[str, any]]:
+        """
+        分页获取项目的开放MR（原始字段字典）
+
+        先请求第一页并读取 x-total-pages 响应头，其余页并发请求；
+        GitLab 在结果过多时不返回总页数，此时沿 next 链接顺序翻页。
+
+        Args:
+            project: GitLab项目对象
+            **filters: 额外的查询条件（source_branch / target_branch 等）
+
+        Returns:
+            MR字典列表
+        """
+        gl = self.gitlab_client.gitlab
+        path = f'/projects/{project.id}/merge_requests'
+        query = dict(filters, state='opened', per_page=100)
+
+        response = gl.http_request('get', path, query_data=dict(query, page=1))
+        mrs = response.json()
+
+        total_pages = response.headers.get('x-total-pages')
+        if total_pages:
+            pages = range(2, int(total_pages) + 1)
+            if pages:
+                with ThreadPoolExecutor(max_workers=min(8, len(pages))) as executor:
+                    for page_mrs in executor.map(
+                            lambda page: gl.http_request('get', path, query_data=dict(query, page=page)).json(),
+                            pages):
+                        mrs.extend(page_mrs)
+        else:
+            next_url = response.links.get('next', {}).get('url')
+            while next_url:
+                response = gl.http_request('get', next_url)
+                mrs.extend(response.json())
+                next_url = response.links.get('next', {}).get('url')
+
+        return mrs
+
     def validate_branch_name(self, branch_name: str, pattern_type: str = 'semantic') -> Tuple[bool, str]:
         """
         验证分支名称是否符合规范
@@ -163,7 +358,7 @@ class BranchCreationPipeline:
         else:
             # 进行正则验证
             pattern = self.version_patterns[pattern_type]
-            if not re.match(pattern, branch_name):
+            if not self._compiled_patterns[pattern_type].fullmatch(branch_name):
                 return False, f"分支名称不符合 {pattern_type} 模式: {pattern}"
 
         # 检查分支名长度
@@ -171,8 +366,7 @@ class BranchCreationPipeline:
             return False, "分支名称过长（最多100字符）"
 
         # 检查是否包含不允许的字符
-        invalid_chars = ['<', '>', ':', '"', '|', '?', '*', ' ', '\t', '\n']
-        if any(char in branch_name for char in invalid_chars):
+        if len(branch_name.translate(self._invalid_translation)) != len(branch_name):
             return False, "分支名称包含无效字符"
 
         return True, ""
@@ -189,13 +383,14 @@ class BranchCreationPipeline:
             分支是否存在
         """
         try:
-            project = self.gitlab_client.gitlab.projects.get(project_id)
+            project = self._get_project(project_id)
             project.branches.get(branch_name)
             return True
         except Exception:
             return False
 
-    def create_branch(self, project_id: str, source_branch: str, new_branch: str) -> Dict[str, any]:
+    def create_branch(self, project_id: str, source_branch: str, new_branch: str,
+                      created_at: Optional[str] = None) -> Dict[str, any]:
         """
         创建新分支
 
@@ -203,6 +398,7 @@ class BranchCreationPipeline:
             project_id: GitLab项目ID
             source_branch: 源分支
             new_branch: 新分支名称
+            created_at: 记录的创建时间（ISO 格式），为空时取当前时间
 
         Returns:
             创建结果字典
@@ -210,33 +406,37 @@ class BranchCreationPipeline:
         self.logger.info(f"创建分支: {new_branch} (基于 {source_branch})")
 
         try:
-            project = self.gitlab_client.gitlab.projects.get(project_id)
+            project = self._get_project(project_id)
 
-            # 检查源分支是否存在
+            # 创建新分支（源分支不存在、新分支已存在都由创建请求返回错误，无需预先查询）
             try:
-                source = project.branches.get(source_branch)
-                self.logger.debug(f"源分支 {source_branch} 存在 (commit: {source.commit['id'][:8]})")
-            except Exception as e:
+                branch = project.branches.create({
+                    'branch': new_branch,
+                    'ref': source_branch
+                })
+            except GitlabCreateError as e:
+                error_message = str(e.error_message)
+                if e.response_code == 400 and 'already exists' in error_message:
+                    error = f'分支 {new_branch} 已存在'
+                elif e.response_code == 404 or 'Invalid reference name' in error_message \
+                        or 'does not exist' in error_message:
+                    error = f'源分支 {source_branch} 不存在: {error_message}'
+                else:
+                    raise
                 return {
                     'success': False,
-                    'error': f'源分支 {source_branch} 不存在: {str(e)}',
+                    'error': error,
                     'new_branch': new_branch,
                     'source_branch': source_branch
                 }
 
-            # 创建新分支
-            branch = project.branches.create({
-                'branch': new_branch,
-                'ref': source_branch
-            })
-
             result = {
                 'success': True,
                 'new_branch': new_branch,
                 'source_branch': source_branch,
                 'commit': branch.commit['id'],
                 'commit_short': branch.commit['id'][:8],
-                'created_at': datetime.now().isoformat(),
+                'created_at': created_at or datetime.now().isoformat(),
                 'protected': branch.protected
             }
 
@@ -263,7 +463,6 @@ class BranchCreationPipeline:
             (是否成功, 错误信息)
         """
         if not self.webhook_url:
-            self.logger.debug("未配置 Webhook URL，跳过通知")
             return True, ""
 
         try:
@@ -273,28 +472,21 @@ class BranchCreationPipeline:
                 headers['Origin'] = self.webhook_origin
                 headers['Content-Type'] = 'application/json'
 
-            # 解析自定义 JSON
-            try:
-                custom_data = json.loads(self.webhook_custom_json)
-            except json.JSONDecodeError as e:
-                self.logger.warning(f"解析自定义 JSON 失败: {e}，使用空对象")
-                custom_data = {}
-
             # 合并数据（自定义数据在前，分支数据在后，分支数据会覆盖重复键）
-            webhook_data = {**custom_data, **data}
+            webhook_data = {**self._webhook_custom_data, **data}
 
             self.logger.info(f"发送 WPS Webhook: {self.webhook_method} {self.webhook_url}")
 
             # 发送请求
             if self.webhook_method == 'POST':
-                response = requests.post(
+                response = self._webhook_session.post(
                     self.webhook_url,
-                    json=webhook_data,
+                    data=orjson.dumps(webhook_data, default=str),
                     headers=headers,
                     timeout=10
                 )
             elif self.webhook_method == 'GET':
-                response = requests.get(
+                response = self._webhook_session.get(
                     self.webhook_url,
                     params=webhook_data,
                     headers={'Origin': self.webhook_origin} if self.webhook_origin else {},
@@ -335,7 +527,9 @@ class BranchCreationPipeline:
                             version_name: str,
                             pattern_type: str = 'semantic',
                             force_create: bool = False,
-                            check_open_mrs: bool = True) -> Dict[str, any]:
+                            check_open_mrs: bool = True,
+                            precomputed_mr_check: Optional[Dict[str, any]] = None,
+                            created_at: Optional[str] = None) -> Dict[str, any]:
         """
         创建版本分支（完整流程）
 
@@ -346,12 +540,15 @@ class BranchCreationPipeline:
             pattern_type: 分支名验证模式
             force_create: 强制创建（忽略未合并MR检查）
             check_open_mrs: 是否检查未合并MR
+            precomputed_mr_check: 已获取的未合并MR检查结果（批量模式共用，提供时不再重复查询）
+            created_at: 记录的创建时间（批量模式统一使用批次开始时间）
 
         Returns:
             操作结果字典
         """
         start_time = time.time()
-        # 分支锁 - 已移除，改为串行执行
+        # 分支锁 - 已移除，改为串行执行；如需恢复，只包住下方 try 块（步骤1-3 的 GitLab 操作），
+        # 结果组装和 Webhook 通知在锁外进行
         # lock_name = f"branch_creation_{project_id}_{source_branch}_{version_name}"
 
         # with file_lock(lock_name, timeout=60) as locked:
@@ -374,18 +571,10 @@ class BranchCreationPipeline:
                         'execution_time': time.time() - start_time
                     }
 
-                # 2. 检查分支是否已存在
-                if self.check_branch_exists(project_id, version_name):
-                    return {
-                        'success': False,
-                        'error': f'分支 {version_name} 已存在',
-                        'execution_time': time.time() - start_time
-                    }
-
-                # 3. 检查未合并的MR
+                # 2. 检查未合并的MR
                 mr_check_result = None
                 if check_open_mrs and not force_create:
-                    mr_check_result = self.check_open_merge_requests(project_id, source_branch)
+                    mr_check_result = precomputed_mr_check or self.check_open_merge_requests(project_id, source_branch)
 
                     if mr_check_result.get('has_open_mrs', False):
                         self.logger.warning(f"分支 {source_branch} 有未合并的MR，跳过创建")
@@ -405,50 +594,16 @@ class BranchCreationPipeline:
                             'execution_time': time.time() - start_time
                         }
 
-                # 4. 创建分支
-                create_result = self.create_branch(project_id, source_branch, version_name)
-
-                execution_time = time.time() - start_time
-
-                if create_result['success']:
-                    # 构建成功结果
-                    result = {
-                        'success': True,
-                        'project_id': project_id,
-                        'source_branch': source_branch,
-                        'version_branch': version_name,
-                        'commit': create_result['commit'],
-                        'commit_short': create_result['commit_short'],
-                        'created_at': create_result['created_at'],
-                        'execution_time': execution_time,
-                        'mr_check_result': mr_check_result
-                    }
-
-                    # 5. 发送 WPS Webhook 通知
-                    webhook_data = {
-                        'project_id': project_id,
-                        'source_branch': source_branch,
-                        'version_branch': version_name,
-                        'commit': create_result['commit'],
-                        'commit_short': create_result['commit_short'],
-                        'created_at': create_result['created_at'],
-                        'status': 'success'
-                    }
-
-                    webhook_success, webhook_error = self.send_webhook_notification(webhook_data)
-                    result['webhook_notification'] = {
-                        'success': webhook_success,
-                        'error': webhook_error
-                    }
+                # 3. 创建分支（分支已存在由创建请求本身判断）
+                create_result = self.create_branch(project_id, source_branch, version_name,
+                                                   created_at=created_at)
 
-                    self.logger.info(f"版本分支创建完成: {version_name} (执行时间: {execution_time:.2f}s)")
-                    return result
-                else:
+                if not create_result['success']:
                     # 创建失败
                     return {
                         'success': False,
                         'error': create_result['error'],
-                        'execution_time': execution_time,
+                        'execution_time': time.time() - start_time,
                         'mr_check_result': mr_check_result
                     }
 
@@ -462,10 +617,47 @@ class BranchCreationPipeline:
                 'execution_time': execution_time
             }
 
+        # 分支已创建，以下不再涉及 GitLab 状态
+        execution_time = time.time() - start_time
+
+        # 构建成功结果
+        result = {
+            'success': True,
+            'project_id': project_id,
+            'source_branch': source_branch,
+            'version_branch': version_name,
+            'commit': create_result['commit'],
+            'commit_short': create_result['commit_short'],
+            'created_at': create_result['created_at'],
+            'execution_time': execution_time,
+            'mr_check_result': mr_check_result
+        }
+
+        # 4. 发送 WPS Webhook 通知（未配置时直接跳过）
+        if self.webhook_url:
+            webhook_data = {
+                'project_id': project_id,
+                'source_branch': source_branch,
+                'version_branch': version_name,
+                'commit': create_result['commit'],
+                'commit_short': create_result['commit_short'],
+                'created_at': create_result['created_at'],
+                'status': 'success'
+            }
+
+            # 后台发送，结果由 send_webhook_notification 记录日志
+            self._webhook_executor.submit(self.send_webhook_notification, webhook_data)
+            result['webhook_notification'] = {'pending': True}
+        else:
+            result['webhook_notification'] = {'success': True, 'skipped': True}
+
+        self.logger.info(f"版本分支创建完成: {version_name} (执行时间: {execution_time:.2f}s)")
+        return result
+
     def batch_create_version_branches(self,
                                     project_id: str,
                                     source_branch: str,
-                                    version_list: List[str],
+                                    version_list: Iterable[str],
                                     pattern_type: str = 'semantic',
                                     force_create: bool = False) -> List[Dict[str, any]]:
         """
@@ -474,27 +666,61 @@ class BranchCreationPipeline:
         Args:
             project_id: GitLab项目ID
             source_branch: 源分支
-            version_list: 版本名称列表
+            version_list: 版本名称列表或迭代器（逐个消费，无需预先全部读入）
             pattern_type: 分支名验证模式
             force_create: 强制创建
 
         Returns:
             创建结果列表
         """
-        self.logger.info(f"开始批量创建 {len(version_list)} 个版本分支")
+        self.logger.info("开始批量创建版本分支")
+        batch_start_iso = datetime.now().isoformat()
 
-        results = []
-        for i, version in enumerate(version_list, 1):
-            self.logger.info(f"创建版本 {i}/{len(version_list)}: {version}")
+        # 所有版本基于同一源分支，源分支存在性和未合并MR都只需检查一次
+        try:
+            self._get_project(project_id).branches.get(source_branch)
+        except Exception as e:
+            self.logger.error(f"源分支 {source_branch} 不存在，停止批量创建")
+            return [{
+                'success': False,
+                'error': f'源分支 {source_branch} 不存在: {str(e)}',
+                'execution_time': 0
+            }]
+
+        mr_check_result = None
+        if not force_create:
+            mr_check_result = self.check_open_merge_requests(project_id, source_branch)
 
-            result = self.create_version_branch(
+        def create(version: str) -> Dict[str, any]:
+            return self.create_version_branch(
                 project_id=project_id,
                 source_branch=source_branch,
                 version_name=version,
                 pattern_type=pattern_type,
-                force_create=force_create
+                force_create=force_create,
+                precomputed_mr_check=mr_check_result,
+                created_at=batch_start_iso
             )
 
+        # 强制创建时各版本互不影响，边读取边并发创建；
+        # 在途任务数有上限，结果按输入顺序收集
+        if force_create:
+            workers = 8
+            results = []
+            pending = deque()
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='branch-create') as executor:
+                for version in version_list:
+                    pending.append(executor.submit(create, version))
+                    if len(pending) >= workers * 2:
+                        results.append(pending.popleft().result())
+                results.extend(future.result() for future in pending)
+            return results
+
+        results = []
+        for i, version in enumerate(version_list, 1):
+            self.logger.info(f"创建版本 {i}: {version}")
+
+            result = create(version)
             results.append(result)
 
             # 如果失败且不是强制创建，停止后续创建
@@ -505,6 +731,21 @@ class BranchCreationPipeline:
         return results
 
 
+def iter_versions(versions_file: Optional[str] = None) -> Iterator[str]:
+    """
+    逐行读取版本列表，跳过空行
+
+    Args:
+        versions_file: 版本列表文件路径，为空时从标准输入读取
+    """
+    if versions_file is None:
+        yield from (line.strip() for line in sys.stdin if line.strip())
+        return
+
+    with open(versions_file, 'r') as f:
+        yield from (line.strip() for line in f if line.strip())
+
+
 def main():
     """命令行入口"""
     parser = argparse.ArgumentParser(description='GitLab分支创建流水线')
@@ -555,64 +796,58 @@ def main():
     #         sys.exit(1)
 
     try:
-        # 创建流水线实例
-        pipeline = BranchCreationPipeline(
+        # 创建流水线实例（退出时等待后台 Webhook 发送完成）
+        with BranchCreationPipeline(
             log_level=args.log_level,
             webhook_url=args.webhook_url,
             webhook_method=args.webhook_method,
             webhook_origin=args.webhook_origin,
             webhook_custom_json=args.webhook_json
-        )
-
-        if args.batch_mode:
-            # 批量模式
-            versions = []
-
-            if args.versions_file:
-                # 从文件读取版本列表
-                with open(args.versions_file, 'r') as f:
-                    versions = [line.strip() for line in f if line.strip()]
-            else:
-                # 从标准输入读取版本列表
-                print("请输入要创建的版本列表（每行一个版本）：")
-                versions = [line.strip() for line in sys.stdin if line.strip()]
-
-            if not versions:
-                print("❌ 未提供版本列表")
-                sys.exit(1)
-
-            results = pipeline.batch_create_version_branches(
-                project_id=args.project_id,
-                source_branch=args.source_branch,
-                version_list=versions,
-                pattern_type=args.pattern_type,
-                force_create=args.force_create
-            )
+        ) as pipeline:
+            if args.batch_mode:
+                # 批量模式：从文件或标准输入逐行读取版本列表
+                if not args.versions_file:
+                    print("请输入要创建的版本列表（每行一个版本）：")
+                versions = iter_versions(args.versions_file)
+
+                first_version = next(versions, None)
+                if first_version is None:
+                    print("❌ 未提供版本列表")
+                    sys.exit(1)
+                versions = itertools.chain([first_version], versions)
+
+                results = pipeline.batch_create_version_branches(
+                    project_id=args.project_id,
+                    source_branch=args.source_branch,
+                    version_list=versions,
+                    pattern_type=args.pattern_type,
+                    force_create=args.force_create
+                )
 
-            # 打印结果
-            print(f"\n📊 批量创建完成，共 {len(results)} 个版本")
-            success_count = sum(1 for r in results if r['success'])
-            print(f"成功: {success_count}, 失败: {len(results) - success_count}")
+                # 打印结果
+                print(f"\n📊 批量创建完成，共 {len(results)} 个版本")
+                success_count = sum(1 for r in results if r['success'])
+                print(f"成功: {success_count}, 失败: {len(results) - success_count}")
 
-            for result in results:
-                if result['success']:
-                    print(f"  ✅ {result['version_branch']} (commit: {result['commit_short']})")
-                else:
-                    print(f"  ❌ {result.get('version_branch', '未知')} - {result.get('error', 'Unknown error')}")
+                for result in results:
+                    if result['success']:
+                        print(f"  ✅ {result['version_branch']} (commit: {result['commit_short']})")
+                    else:
+                        print(f"  ❌ {result.get('version_branch', '未知')} - {result.get('error', 'Unknown error')}")
 
-        else:
-            # 单版本模式
-            result = pipeline.create_version_branch(
-                project_id=args.project_id,
-                source_branch=args.source_branch,
-                version_name=args.version,
-                pattern_type=args.pattern_type,
-                force_create=args.force_create,
-                check_open_mrs=not args.skip_mr_check
-            )
+            else:
+                # 单版本模式
+                result = pipeline.create_version_branch(
+                    project_id=args.project_id,
+                    source_branch=args.source_branch,
+                    version_name=args.version,
+                    pattern_type=args.pattern_type,
+                    force_create=args.force_create,
+                    check_open_mrs=not args.skip_mr_check
+                )
 
-            # 打印结果
-            print_result(result)
+                # 打印结果
+                print_result(result)
 
     except Exception as e:
         logger.error(f"流水线执行失败: {e}")
@@ -638,10 +873,12 @@ def print_result(result):
             print(f"  传入MR: {len(mr_check.get('incoming_mrs', []))} 个")
             print(f"  总计: {mr_check.get('total_open_mrs', 0)} 个")
 
-        # 显示Webhook通知结果
-        if result.get('webhook_notification'):
-            webhook = result['webhook_notification']
-            if webhook.get('success'):
+        # 显示Webhook通知结果（未配置 Webhook 时不显示）
+        webhook = result.get('webhook_notification')
+        if webhook and not webhook.get('skipped'):
+            if webhook.get('pending'):
+                print(f"\n📡 WPS Webhook 通知: ⏳ 已提交后台发送")
+            elif webhook.get('success'):
                 print(f"\n📡 WPS Webhook 通知: ✅ 发送成功")
             else:
                 print(f"\n📡 WPS Webhook 通知: ❌ 发送失败")
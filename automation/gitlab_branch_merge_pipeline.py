@@ -6,34 +6,87 @@ GitLab分支合并流水线
 
 import os
 import sys
-import argparse
 import time
-from datetime import datetime
-from typing import Dict, List, Optional
+import itertools
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import quote
 
 # 添加项目根目录到路径
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 
+from shared.file_lock import FileLock, file_lock
 from shared.gitlab_client import GitLabClient
 from shared.utils import setup_logging
-from shared.file_lock import file_lock
+
+# 合并完成时间格式（本地时间，精确到秒）
+MERGE_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+# 命令行参数名 -> merge_branches 参数名
+_MERGE_KW = {
+    'title': 'mr_title',
+    'description': 'mr_description',
+    'assignee_id': 'assignee_id',
+    'reviewer_ids': 'reviewer_ids',
+    'labels': 'labels',
+    'merge_commit_message': 'merge_commit_message',
+    'remove_source_branch': 'remove_source_branch',
+    'merge_when_pipeline_succeeds': 'merge_when_pipeline_succeeds',
+}
+
+# 取反的命令行开关 -> merge_branches 参数名
+_NEGATED_MERGE_KW = {
+    'no_squash': 'squash',
+    'no_auto_merge': 'auto_merge',
+}
+
+
+def _failure_result(project_id: str, source_branch: str, target_branch: str,
+                    error: str, execution_time: float) -> Dict:
+    """构建合并失败的结果字典"""
+    return {
+        'success': False,
+        'project_id': project_id,
+        'source_branch': source_branch,
+        'target_branch': target_branch,
+        'error': error,
+        'execution_time': execution_time
+    }
 
 
 class BranchMergePipeline:
     """分支合并流水线"""
 
-    def __init__(self, log_level: str = 'INFO'):
+    # 批量合并的收缩窗口：初始大小与上限
+    INITIAL_WINDOW = 10
+    MAX_WINDOW = 25
+
+    def __init__(self, log_level: str = 'INFO', logger: Optional[logging.Logger] = None):
         """
         初始化合并流水线
 
         Args:
             log_level: 日志级别
+            logger: 已配置好的logger，提供时不再重新配置日志
         """
-        self.logger = setup_logging(level=log_level)
-        self.gitlab_client = GitLabClient(log_level=log_level)
+        self.logger = logger or setup_logging(level=log_level)
+        self.gitlab_client = GitLabClient(log_level=log_level, logger=self.logger)
+
+        # 同一 (项目, 目标分支) 的合并步骤串行执行，不同目标分支互不影响
+        self._target_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._target_locks_guard = threading.Lock()
+
         self.logger.info("GitLab分支合并流水线初始化完成")
 
+    def _target_lock(self, project_id: str, target_branch: str) -> threading.Lock:
+        """获取 (项目, 目标分支) 对应的合并锁"""
+        with self._target_locks_guard:
+            return self._target_locks.setdefault((project_id, target_branch), threading.Lock())
+
     def merge_branches(self,
                        project_id: str,
                        source_branch: str,
@@ -46,7 +99,8 @@ class BranchMergePipeline:
                        auto_merge: bool = True,
                        merge_commit_message: Optional[str] = None,
                        remove_source_branch: bool = False,
-                       squash: bool = False) -> Dict:
+                       squash: bool = False,
+                       merge_when_pipeline_succeeds: bool = False) -> Dict:
         """
         执行分支合并流程
 
@@ -63,164 +117,279 @@ class BranchMergePipeline:
             merge_commit_message: 合并提交消息
             remove_source_branch: 合并后是否删除源分支
             squash: 是否压缩提交
+            merge_when_pipeline_succeeds: 由GitLab在流水线成功后自动合并，不在本地等待流水线
 
         Returns:
             合并结果字典
         """
-        start_time = time.time()
-        lock_name = f"branch_merge_{project_id}_{source_branch}_{target_branch}"
-
-        # 获取锁，防止并发合并
-        with file_lock(lock_name, timeout=0) as locked:
-            if not locked:
-                self.logger.warning(
-                    f"分支合并正在进行中: {source_branch} -> {target_branch}")
-                return {
-                    'success': False,
-                    'error': '分支合并正在进行中',
-                    'execution_time': time.time() - start_time
-                }
-
-            try:
-                self.logger.info(
-                    f"开始合并分支: {source_branch} -> {target_branch}")
+        start_time = time.perf_counter()
+
+        if source_branch == target_branch:
+            self.logger.warning("源分支与目标分支相同，跳过: %s", source_branch)
+            return _failure_result(
+                project_id, source_branch, target_branch, '源分支与目标分支相同', time.perf_counter() - start_time)
+
+        log_extra = {'project_id': project_id, 'source_branch': source_branch, 'target_branch': target_branch}
+
+        # 获取锁，防止并发合并（分支名中的 / 转义后再作为锁文件名）
+        merge_lock = FileLock(
+            f"branch_merge_{quote(str(project_id), safe='')}_{quote(source_branch, safe='')}_{quote(target_branch, safe='')}")
+        if not merge_lock.acquire(timeout=0):
+            self.logger.warning(
+                "分支合并正在进行中: %s -> %s", source_branch, target_branch, extra=log_extra)
+            return _failure_result(
+                project_id, source_branch, target_branch, '分支合并正在进行中', time.perf_counter() - start_time)
 
-                # 1. 创建合并请求
-                if not mr_title:
-                    mr_title = f"Merge {source_branch} into {target_branch}"
+        try:
+            self.logger.info(
+                "开始合并分支: %s -> %s", source_branch, target_branch, extra=log_extra)
+
+            # 1. 创建合并请求
+            mr_title = mr_title or f"Merge {source_branch} into {target_branch}"
 
-                self.logger.info(f"创建合并请求: {mr_title}")
+            self.logger.info("创建合并请求: %s", mr_title, extra=log_extra)
 
-                mr = self.gitlab_client.create_merge_request(
+            mr = self.gitlab_client.create_merge_request(
+                project_id=project_id,
+                source_branch=source_branch,
+                target_branch=target_branch,
+                title=mr_title,
+                description=mr_description,
+                assignee_id=assignee_id,
+                reviewer_ids=reviewer_ids,
+                labels=labels,
+                remove_source_branch=remove_source_branch,
+                squash=squash
+            )
+
+            # 创建失败多为已存在相同的开放MR（重试/重复提交），此时复用该MR
+            if not mr:
+                mr = self.gitlab_client.find_open_merge_request(
                     project_id=project_id,
                     source_branch=source_branch,
-                    target_branch=target_branch,
-                    title=mr_title,
-                    description=mr_description,
-                    assignee_id=assignee_id,
-                    reviewer_ids=reviewer_ids,
-                    labels=labels,
-                    remove_source_branch=remove_source_branch,
-                    squash=squash
+                    target_branch=target_branch
                 )
+                if mr:
+                    self.logger.info("复用已存在的合并请求: !%s", mr['iid'], extra=log_extra)
+
+            if not mr:
+                execution_time = time.perf_counter() - start_time
+                self.logger.error("创建合并请求失败", extra=log_extra)
+                return _failure_result(
+                    project_id, source_branch, target_branch, '创建合并请求失败', execution_time)
+
+            mr_iid = mr['iid']
+            mr_web_url = mr['web_url']
+            self.logger.info("合并请求已就绪: !%s", mr_iid, extra={**log_extra, 'mr_iid': mr_iid})
+
+            # 2. 自动合并（如果启用）
+            merge_result = None
+            if auto_merge:
+                self.logger.info("自动合并MR: !%s", mr_iid, extra={**log_extra, 'mr_iid': mr_iid})
 
-                if not mr:
-                    execution_time = time.time() - start_time
-                    self.logger.error("创建合并请求失败")
-                    return {
-                        'success': False,
-                        'error': '创建合并请求失败',
-                        'execution_time': execution_time
-                    }
-
-                mr_iid = mr['iid']
-                mr_web_url = mr['web_url']
-                self.logger.info(f"合并请求创建成功: !{mr_iid}")
-
-                # 2. 自动合并（如果启用）
-                merge_result = None
-                if auto_merge:
-                    self.logger.info(f"自动合并MR: !{mr_iid}")
-
-                    # 构建合并提交消息
-                    if not merge_commit_message:
-                        merge_commit_message = f"Merge branch '{source_branch}' into '{target_branch}'"
-
-                    # 执行批准并合并
+                # 构建合并提交消息
+                merge_commit_message = merge_commit_message or f"Merge branch '{source_branch}' into '{target_branch}'"
+
+                # 执行批准并合并（批量并发时，同一目标分支的合并依次进行）
+                with self._target_lock(project_id, target_branch):
                     merge_result = self.gitlab_client.approve_and_merge_merge_request(
                         project_id=project_id,
                         merge_request_iid=mr_iid,
                         merge_commit_message=merge_commit_message,
-                        merge_when_pipeline_succeeds=False,
+                        merge_when_pipeline_succeeds=merge_when_pipeline_succeeds,
                         wait_for_pipeline=False
                     )
 
-                    if merge_result.get('success'):
-                        self.logger.info(
-                            f"合并成功: !{mr_iid} -> {target_branch}")
-                    else:
-                        self.logger.warning(
-                            f"自动合并失败: {merge_result.get('error', 'Unknown error')}")
-
-                # 3. 计算执行时间
-                execution_time = time.time() - start_time
-
-                # 4. 构建返回结果
-                result = {
-                    'success': True,
-                    'project_id': project_id,
-                    'source_branch': source_branch,
-                    'target_branch': target_branch,
-                    'mr_iid': mr_iid,
-                    'mr_title': mr['title'],
-                    'mr_web_url': mr_web_url,
-                    'auto_merge': auto_merge,
-                    'merge_result': merge_result,
-                    'execution_time': execution_time,
-                    'merge_time': datetime.now().isoformat()
-                }
+                if merge_result.get('success'):
+                    self.logger.info(
+                        "合并成功: !%s -> %s", mr_iid, target_branch, extra={**log_extra, 'mr_iid': mr_iid})
+                else:
+                    self.logger.warning(
+                        "自动合并失败: %s", merge_result.get('error', 'Unknown error'),
+                        extra={**log_extra, 'mr_iid': mr_iid})
+
+            # 3. 计算执行时间
+            execution_time = time.perf_counter() - start_time
+
+            # 4. 构建返回结果
+            result = {
+                'success': True,
+                'project_id': project_id,
+                'source_branch': source_branch,
+                'target_branch': target_branch,
+                'mr_iid': mr_iid,
+                'mr_title': mr['title'],
+                'mr_web_url': mr_web_url,
+                'auto_merge': auto_merge,
+                'merge_result': merge_result,
+                'execution_time': execution_time,
+                'merge_time': time.strftime(MERGE_TIME_FORMAT)
+            }
 
-                self.logger.info(
-                    f"分支合并完成: {source_branch} -> {target_branch} (执行时间: {execution_time:.2f}s)")
-                return result
-
-            except Exception as e:
-                execution_time = time.time() - start_time
-                self.logger.error(f"分支合并失败: {e}")
-
-                return {
-                    'success': False,
-                    'project_id': project_id,
-                    'source_branch': source_branch,
-                    'target_branch': target_branch,
-                    'error': str(e),
-                    'execution_time': execution_time
-                }
+            self.logger.info(
+                "分支合并完成: %s -> %s (执行时间: %.2fs)", source_branch, target_branch, execution_time,
+                extra={**log_extra, 'mr_iid': mr_iid, 'execution_time': execution_time})
+            return result
+
+        except Exception as e:
+            execution_time = time.perf_counter() - start_time
+            self.logger.error("分支合并失败: %s", e, extra=log_extra)
+
+            return _failure_result(
+                project_id, source_branch, target_branch, str(e), execution_time)
+        finally:
+            merge_lock.release()
 
     def batch_merge_branches(self,
                              project_id: str,
-                             branches: List[str],
+                             branches: Iterable[str],
                              target_branch: str = 'main',
+                             max_workers: int = 8,
+                             requeue_failed: bool = False,
+                             results_sink: Optional[Callable[[Dict], None]] = None,
                              **merge_kwargs) -> List[Dict]:
         """
         批量合并多个分支到目标分支
 
+        按收缩窗口调度：每轮并发处理 window 个分支（受 max_workers 限制），
+        本轮有失败则窗口减半，全部成功则窗口加一；窗口已为 1 时仍失败才中止。
+        合并到同一目标分支的步骤由目标分支锁串行化。分支按需从 branches 中读取并去重，
+        可直接传入生成器，首轮合并无需等待整个列表读取完毕。
+
         Args:
             project_id: GitLab项目ID
-            branches: 源分支列表
+            branches: 源分支列表或可迭代对象
             target_branch: 目标分支名称
+            max_workers: 最大并发数
+            requeue_failed: 失败分支是否重新排到队尾重试一次
+            results_sink: 结果回调，提供时每个分支的最终结果完成即交给回调，不在内存中累积
             **merge_kwargs: 合并参数
 
         Returns:
-            合并结果列表
+            合并结果列表（按输入顺序，重试分支取最后一次结果）；提供 results_sink 时为空列表
         """
+        workers = max(1, max_workers)
         self.logger.info(
-            f"开始批量合并 {len(branches)} 个分支到 {target_branch}")
+            "开始批量合并分支到 %s (并发: %d)", target_branch, workers)
 
-        results = []
-        for branch in branches:
-            self.logger.info(f"处理分支: {branch}")
-
-            result = self.merge_branches(
+        def merge(branch: str) -> Dict:
+            self.logger.info("处理分支: %s", branch)
+            return self.merge_branches(
                 project_id=project_id,
                 source_branch=branch,
                 target_branch=target_branch,
                 **merge_kwargs
             )
 
-            results.append(result)
+        # 源分支按需去重、编号读取；重试的分支在源读完后再处理
+        seen: Set[str] = set()
+        duplicates = 0
+
+        def unique_branches() -> Iterator[str]:
+            nonlocal duplicates
+            for branch in branches:
+                if branch in seen:
+                    duplicates += 1
+                    continue
+                seen.add(branch)
+                yield branch
+
+        source = enumerate(unique_branches())
+        retry_queue = deque()
+        # 等待重试的分支的首次失败结果，未能重试时作为最终结果
+        requeued: Dict[int, Dict] = {}
+        results: Dict[int, Dict] = {}
+
+        def emit(index: int, result: Dict) -> None:
+            if results_sink is None:
+                results[index] = result
+            else:
+                results_sink(result)
+        window = self.INITIAL_WINDOW
+        aborted = False
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='branch-merge') as executor:
+            while True:
+                chunk = list(itertools.islice(source, window))
+                while len(chunk) < window and retry_queue:
+                    chunk.append(retry_queue.popleft())
+                if not chunk:
+                    break
+
+                futures = [(index, branch, executor.submit(merge, branch)) for index, branch in chunk]
+
+                failed_count = 0
+                for index, branch, future in futures:
+                    retried = requeued.pop(index, None) is not None
+                    result = future.result()
+                    if not result['success']:
+                        failed_count += 1
+                        if requeue_failed and not retried:
+                            requeued[index] = result
+                            retry_queue.append((index, branch))
+                            continue
+                    emit(index, result)
 
-            # 如果失败，停止后续合并
-            if not result['success']:
-                self.logger.error(
-                    f"分支 {branch} 合并失败，停止后续合并")
-                break
+                self.logger.info(
+                    "批量窗口完成: window_size=%d failed_count=%d", window, failed_count,
+                    extra={'window_size': window, 'failed_count': failed_count})
+
+                if not failed_count:
+                    window = min(window + 1, self.MAX_WINDOW)
+                elif window == 1:
+                    aborted = True
+                    break
+                else:
+                    window = max(1, window // 2)
+
+        # 中止时未能重试的分支以首次失败结果收尾
+        for index, _ in retry_queue:
+            emit(index, requeued[index])
+
+        if duplicates:
+            self.logger.info("已跳过重复分支: deduped_count=%d", duplicates,
+                             extra={'deduped_count': duplicates})
+
+        if aborted:
+            self.logger.error("窗口已收缩至 1 且仍有分支合并失败，停止后续合并")
 
-        return results
+        return [results[index] for index in sorted(results)]
+
+
+def build_merge_kwargs(options: Dict) -> Dict:
+    """从命令行参数字典中提取 merge_branches 的参数"""
+    merge_kwargs = {name: options[key] for key, name in _MERGE_KW.items()}
+    merge_kwargs.update((name, not options[key]) for key, name in _NEGATED_MERGE_KW.items())
+    return merge_kwargs
+
+
+def _clean_branch_lines(lines: Iterable[str]) -> Iterator[str]:
+    """去除首尾空白，跳过空行和 # 开头的注释行"""
+    for line in lines:
+        branch = line.strip()
+        if branch and not branch.startswith('#'):
+            yield branch
+
+
+def iter_branches(branches_file: Optional[str] = None) -> Iterator[str]:
+    """
+    逐行读取分支列表，跳过空行和 # 开头的注释行
+
+    Args:
+        branches_file: 分支列表文件路径，为空时从标准输入读取
+    """
+    if branches_file is None:
+        yield from _clean_branch_lines(sys.stdin)
+        return
+
+    with open(branches_file, 'r', encoding='utf-8') as f:
+        yield from _clean_branch_lines(f)
 
 
 def main():
     """命令行入口"""
+    # 仅命令行使用的依赖在此导入，以编程方式调用流水线时无需加载
+    import argparse
+
     parser = argparse.ArgumentParser(
         description='GitLab分支合并流水线')
 
@@ -250,82 +419,94 @@ def main():
     # 模式选择
     parser.add_argument('--no-auto-merge', action='store_true',
                         help='不自动合并（仅创建MR）')
+    parser.add_argument('--merge-when-pipeline-succeeds', action='store_true',
+                        help='流水线成功后由GitLab自动合并，不在本地等待')
     parser.add_argument('--batch-mode', action='store_true',
                         help='批量模式（从文件或标准输入读取分支列表）')
     parser.add_argument('--branches-file', help='分支列表文件路径')
+    parser.add_argument('--max-workers', type=int, default=8,
+                        help='批量模式最大并发数 (默认: 8)')
+    parser.add_argument('--requeue-failed', action='store_true',
+                        help='批量模式下失败分支排到队尾重试一次')
+    parser.add_argument('--results-jsonl',
+                        help='批量模式下将每个分支的结果逐行写入JSONL文件')
 
     # 其他参数
     parser.add_argument('--log-level', default='INFO',
                         help='日志级别 (默认: INFO)')
+    parser.add_argument('--output-format', choices=['json', 'text'], default='text',
+                        help='输出格式 (默认: text)')
+    parser.add_argument('--log-format', choices=['json', 'text'], default='text',
+                        help='日志格式 (默认: text)')
     parser.add_argument('--lock-timeout', type=int, default=0,
                         help='锁等待超时时间（秒），0表示不等待')
 
     args = parser.parse_args()
 
-    # 设置日志
-    logger = setup_logging(args.log_level)
+    # 设置日志（JSON输出时日志写到标准错误，标准输出只有结果JSON）
+    json_output = args.output_format == 'json'
+    logger = setup_logging(args.log_level, json_format=args.log_format == 'json',
+                           stream=sys.stderr if json_output else sys.stdout)
+
+    def fail(message: str) -> None:
+        """输出错误并退出（JSON输出时以JSON格式输出）"""
+        if json_output:
+            print_json({'success': False, 'error': message})
+        else:
+            print(f"❌ {message}")
+        sys.exit(1)
 
     # 全局锁逻辑
-    global_lock_name = f"gitlab_branch_merge_global_{args.project_id}"
+    global_lock_name = f"gitlab_branch_merge_global_{quote(args.project_id, safe='')}"
 
     with file_lock(global_lock_name, timeout=args.lock_timeout) as locked:
         if not locked:
-            print("❌ GitLab分支合并流水线正在运行，请稍后再试")
-            sys.exit(1)
+            fail("GitLab分支合并流水线正在运行，请稍后再试")
 
         try:
             # 创建流水线实例
-            pipeline = BranchMergePipeline(log_level=args.log_level)
+            pipeline = BranchMergePipeline(log_level=args.log_level, logger=logger)
 
             # 构建合并参数
-            merge_kwargs = {
-                'mr_title': args.title,
-                'mr_description': args.description,
-                'assignee_id': args.assignee_id,
-                'reviewer_ids': args.reviewer_ids,
-                'labels': args.labels,
-                'merge_commit_message': args.merge_commit_message,
-                'remove_source_branch': args.remove_source_branch,
-                'squash': not args.no_squash,
-                'auto_merge': not args.no_auto_merge
-            }
+            merge_kwargs = build_merge_kwargs(vars(args))
 
             # 执行合并
             if args.batch_mode:
-                # 批量模式
-                branches = []
-
-                if args.branches_file:
-                    # 从文件读取分支列表
-                    with open(args.branches_file, 'r') as f:
-                        branches = [line.strip()
-                                   for line in f if line.strip()]
-                else:
-                    # 从标准输入读取分支列表
+                # 批量模式：从文件或标准输入逐行读取分支列表
+                if not args.branches_file and not json_output:
                     print("请输入要合并的分支列表（每行一个分支）：")
-                    branches = [line.strip()
-                               for line in sys.stdin if line.strip()]
 
-                if not branches:
-                    print("❌ 未提供分支列表")
-                    sys.exit(1)
+                branches = iter_branches(args.branches_file)
+                first_branch = next(branches, None)
+                if first_branch is None:
+                    fail("未提供分支列表")
+                branches = itertools.chain([first_branch], branches)
 
-                results = pipeline.batch_merge_branches(
+                batch_kwargs = dict(
                     project_id=args.project_id,
                     branches=branches,
                     target_branch=args.target_branch,
+                    max_workers=args.max_workers,
+                    requeue_failed=args.requeue_failed,
                     **merge_kwargs
                 )
 
-                # 打印结果
-                print(f"\n📊 批量合并完成，共 {len(results)} 个分支")
-                for result in results:
-                    if result['success']:
-                        print(
-                            f"  ✅ {result['source_branch']} -> {result['target_branch']}")
+                if args.results_jsonl:
+                    # 结果逐行写入文件，只输出汇总
+                    summary = merge_to_jsonl(pipeline, args.results_jsonl, **batch_kwargs)
+                    if json_output:
+                        print_json(summary)
                     else:
-                        print(
-                            f"  ❌ {result['source_branch']} 失败: {result.get('error', 'Unknown error')}")
+                        print(f"\n📊 批量合并完成，共 {summary['total']} 个分支，"
+                              f"失败 {summary['failed']} 个，结果已写入 {summary['results_file']}")
+                else:
+                    results = pipeline.batch_merge_branches(**batch_kwargs)
+
+                    # 打印结果
+                    if json_output:
+                        print_json(results)
+                    else:
+                        print_batch_results(results)
 
             else:
                 # 单分支模式
@@ -337,13 +518,72 @@ def main():
                 )
 
                 # 打印结果
-                print_result(result)
+                if json_output:
+                    print_json(result)
+                else:
+                    print_result(result)
 
         except Exception as e:
             logger.error(f"流水线执行失败: {e}")
+            if json_output:
+                print_json({'success': False, 'error': f"流水线执行失败: {e}"})
             sys.exit(1)
 
 
+def merge_to_jsonl(pipeline: BranchMergePipeline, path: str, **batch_kwargs) -> Dict:
+    """
+    批量合并并将每个分支的结果逐行写入JSONL文件
+
+    Args:
+        pipeline: 合并流水线
+        path: 结果文件路径
+        **batch_kwargs: batch_merge_branches 参数
+
+    Returns:
+        汇总信息（总数、失败数、结果文件路径）
+    """
+    import orjson
+
+    summary = {'total': 0, 'failed': 0, 'results_file': path}
+
+    with open(path, 'wb') as f:
+        def sink(result: Dict) -> None:
+            summary['total'] += 1
+            if not result['success']:
+                summary['failed'] += 1
+            f.write(orjson.dumps(result, default=str, option=orjson.OPT_APPEND_NEWLINE))
+            # 逐条刷新，便于实时查看进度
+            f.flush()
+
+        pipeline.batch_merge_branches(results_sink=sink, **batch_kwargs)
+
+    return summary
+
+
+def print_json(data) -> None:
+    """以JSON格式输出结果"""
+    import orjson
+
+    sys.stdout.write(orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2).decode())
+    sys.stdout.write('\n')
+
+
+def format_batch_result(result: Dict) -> str:
+    """格式化单条批量合并结果"""
+    if result['success']:
+        return f"  ✅ {result['source_branch']} -> {result['target_branch']}"
+    return f"  ❌ {result['source_branch']} 失败: {result.get('error', 'Unknown error')}"
+
+
+def print_batch_results(results: List[Dict]) -> None:
+    """打印批量合并结果，一次写入标准输出"""
+    lines = [f"\n📊 批量合并完成，共 {len(results)} 个分支"]
+    lines.extend(format_batch_result(result) for result in results)
+    sys.stdout.write('\n'.join(lines))
+    sys.stdout.write('\n')
+    sys.stdout.flush()
+
+
 def print_result(result):
     """打印合并结果"""
     if result['success']:
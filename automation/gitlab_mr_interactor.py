@@ -5,12 +5,23 @@ GitLab MR 审查结果处理器
 """
 
 import os
+import re
 import sys
 import json
+import logging
+import time
 import argparse
+import hashlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from bisect import bisect_right
 from datetime import datetime
-from typing import Dict, List, Any, Optional
-from dataclasses import asdict
+from itertools import islice
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import asdict, dataclass, field
+
+import orjson
+from gitlab.v4.objects import ProjectMergeRequest
 
 # 添加项目根目录到路径
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -19,11 +30,128 @@ sys.path.append(project_root)
 from shared.gitlab_client import GitLabClient
 from config.gitlab_config import get_default_config
 from shared.utils import setup_logging
-from automation.mr_review_engine import MRReviewEngine, ReviewResult, ReviewStatus, ReviewIssue
+from automation.mr_review_engine import MRReviewEngine, ReviewResult, ReviewStatus, ReviewSeverity, ReviewIssue
+from automation.review_state import ReviewStateStore
+
+# ========== 评论模板常量 ==========
+
+# 机器人评论标记（HTML注释，渲染后不可见），用于准确识别本系统发布的评论
+_REVIEW_MARKER = "<!-- ai-review-bot:v1 -->"
+
+# 报告页脚（含生成时间，每次生成都不同，比较评论内容时需要排除）
+_REPORT_FOOTER_PREFIX = "\n---\n\n*🤖 此报告由自动审查系统生成于 "
+
+# 报告头部的审查时间行（每次审查都不同，比较评论内容时同样排除）
+_REVIEW_TIME_LINE_RE = re.compile(r'^\*\*审查时间\*\*: .*$', re.MULTILINE)
+
+# 旧版评论没有标记时的识别规则
+_LEGACY_REVIEW_COMMENT_RE = re.compile(r'🤖|自动审查|AI审查|SonarQube')
+_REVIEW_COMMENT_PREFIXES = ('✅ 代码审查报告', '⚠️ 代码审查报告', '❌ 代码审查报告')
+
+# 从已发布评论中识别审查状态（按顺序匹配，先命中者优先）
+_STATUS_MARKERS = (('✅', 'PASSED'), ('⚠️', 'WARNING'), ('❌', 'FAILED'))
+
+# 从已发布评论中提取问题数量（一次扫描，分组名对应 info 字段）
+_RE_COUNTS = re.compile(
+    r'总计 (?P<total_issues>\d+) 个问题'
+    r'|严重: (?P<critical_issues>\d+)'
+    r'|错误: (?P<error_issues>\d+)'
+    r'|警告: (?P<warning_issues>\d+)'
+)
+
+_STATUS_ICON = {
+    ReviewStatus.PASSED: "✅",
+    ReviewStatus.WARNING: "⚠️",
+    ReviewStatus.FAILED: "❌"
+}
+
+# 文件分析详情每个表格最多列出的行数，超出部分折叠为一行说明
+_MAX_TABLE_ROWS = 50
+
+_SEVERITY_ORDER = ('CRITICAL', 'ERROR', 'WARNING', 'INFO')
+
+_SEVERITY_EMOJI = {'CRITICAL': '🔴', 'ERROR': '🟠', 'WARNING': '🟡', 'INFO': '🔵'}
+
+# 质量评分中各严重程度的扣分权重
+_SEVERITY_WEIGHTS = {'CRITICAL': 30, 'ERROR': 15, 'WARNING': 5, 'INFO': 1}
+
+_ANALYZER_EMOJI = {
+    'ai_syntax_checker': '✅',
+    'ai_intelligent_review': '🧠',
+    'ai_summary': '📊'
+}
+
+_AI_HIGHLIGHTS_CLEAN = (
+    "- 🤖 **AI分析确认**: 代码质量良好，AI智能检查未发现明显问题\n"
+    "- ✅ **语法检查**: 通过，无语法错误\n"
+    "- 🔒 **安全分析**: 通过，未发现安全风险\n"
+    "- ⚡ **性能分析**: 通过，代码性能表现良好\n"
+    "- 🧠 **逻辑分析**: 通过，代码逻辑结构清晰\n"
+)
+
+_RECOMMEND_PASSED_HEAD = (
+    "✅ **AI分析确认：代码质量优秀，推荐合并**\n\n"
+    "- 🤖 AI智能检查：所有质量检查均已通过\n"
+    "- 🔒 安全分析：未发现安全风险\n"
+    "- ⚡ 性能分析：代码性能表现良好\n"
+    "- 🧠 逻辑分析：代码逻辑结构清晰\n"
+)
+
+_RECOMMEND_FAILED_TAIL = (
+    "- 🚫 **严禁合并**：存在阻止性问题\n"
+    "- 🔧 **必须操作**：修复所有CRITICAL和ERROR级问题\n"
+)
+
+_AI_GENERIC_SUGGESTIONS = (
+    "\n### 🤖 AI智能建议\n"
+    "- 🧪 运行完整的单元测试和集成测试\n"
+    "- 📚 更新相关技术文档和API文档\n"
+    "- 🎯 遵循团队编码规范和最佳实践\n"
+    "- 🔍 考虑进行代码覆盖率分析\n"
+    "- ⚡ 进行性能基准测试\n"
+    "- 📋 检查是否有遗留的TODO或FIXME注释\n"
+)
+
+# 质量评分等级：分数 >= 阈值[i] 时取标签[i+1]
+_QUALITY_THRESHOLDS = (70, 80, 90)
+_QUALITY_LABELS = (" (需要改进)\n", " (一般)\n", " (良好)\n", " (优秀)\n")
+
+# AI置信度等级：覆盖度 >= 阈值[i] 时取标签[i+1]
+_AI_CONFIDENCE_THRESHOLDS = (0.6, 0.8)
+_AI_CONFIDENCE_LABELS = (
+    "- 🎯 AI分析置信度：中等（建议人工复核）\n",
+    "- 🎯 AI分析置信度：中高（覆盖较好）\n",
+    "- 🎯 AI分析置信度：高（覆盖全面）\n",
+)
+
+_MERGE_VERDICT = {
+    ReviewStatus.PASSED: "- ✅ 推荐合并：是（质量达标）\n",
+    ReviewStatus.WARNING: "- ⚠️ 推荐合并：建议修复问题后\n",
+}
+_MERGE_VERDICT_BLOCKED = "- ❌ 推荐合并：否（存在阻止性问题）\n"
+
+
+@dataclass
+class IssuePartition:
+    """审查问题的分组结果（一次遍历得到）"""
+    # 按 _SEVERITY_ORDER 预先建好全部分组
+    by_severity: Dict[str, List[ReviewIssue]] = field(
+        default_factory=lambda: {severity: [] for severity in _SEVERITY_ORDER})
+    by_source: Dict[str, int] = field(default_factory=dict)
+    ai_issues_count: int = 0
+    # 按严重程度权重累计的扣分，及据此算出的质量得分（首次计算后缓存）
+    severity_deductions: int = 0
+    quality_score: Optional[float] = None
+
 
 class GitLabMRInteractor:
     """GitLab MR 交互器"""
     
+    # 同一MR对象在各辅助方法间复用的有效期（秒）
+    MR_CONTEXT_TTL = 30
+    # 评论历史缓存有效期（秒），键中包含commit SHA，代码更新后自动失效
+    COMMENT_HISTORY_TTL = 60
+    
     def __init__(self, gitlab_client: Optional[GitLabClient] = None, log_level: str = 'INFO'):
         """
         初始化GitLab交互器
@@ -44,6 +172,19 @@ class GitLabMRInteractor:
             'max_comment_length': 500000,  # 评论最大长度 (500KB)
             'force_recomment': False,  # 强制重新评论（忽略已有评论）
         }
+        
+        # (project_id, mr_iid) -> (获取时间, MR对象)
+        self._ctx: Dict[Tuple[str, int], Tuple[float, Any]] = {}
+        # (project_id, mr_iid) -> (commit_sha, 获取时间, 系统评论列表)
+        # 多个MR并发处理时共用同一实例，两个缓存都只做单键读写，不遍历
+        self._comment_history_cache: Dict[Tuple[str, int], Tuple[Optional[str], float, List[Dict[str, Any]]]] = {}
+        
+        # 已审查commit记录（旧版按MR保存的JSON文件会在首次查询时导入）
+        output_dir = os.path.join(project_root, 'output')
+        self.review_state = ReviewStateStore(
+            os.path.join(output_dir, 'review_state.db'),
+            legacy_dir=os.path.join(output_dir, 'review_commits')
+        )
     
     def set_force_recomment(self, force_recomment: bool):
         """
@@ -70,41 +211,37 @@ class GitLabMRInteractor:
         try:
             self.logger.info(f"开始发布审查结果到MR: {project_id}!{mr_iid}")
             
-            # 1. 检查是否需要执行审查（基于Commit）
-            if not self._should_perform_review(project_id, mr_iid):
+            # 每次发布时刷新一次MR对象，后续步骤共享，避免重复请求
+            mr = self._load_mr_snapshot(project_id, mr_iid)
+            
+            # 1. 检查是否需要执行审查（基于Commit；强制重新评论时无需检查）
+            if self.config['force_recomment']:
+                self.logger.info(f"MR {project_id}!{mr_iid} 启用强制重新评论，执行审查")
+            elif not self._should_perform_review(project_id, mr_iid, mr):
                 self.logger.info(f"MR {project_id}!{mr_iid} 代码无变更，跳过审查")
                 return True
             
             # 2. 检查是否需要发布评论（优化：PASSED且无新问题时跳过）
-            if not self._should_publish_comment(project_id, mr_iid, review_result):
+            if not self._should_publish_comment(project_id, mr_iid, review_result, mr):
                 self.logger.info(f"MR {project_id}!{mr_iid} 审查通过且无新问题，跳过评论更新")
                 
                 # 仍然需要更新标签和记录commit（如果需要）
-                if self.config['auto_label']:
-                    self._update_labels(project_id, mr_iid, review_result)
-                
-                self._record_reviewed_commit(project_id, mr_iid)
+                self._finalize_review(project_id, mr_iid, review_result, mr, block=False)
                 return True
             
             # 3. 生成评论内容
-            comment = self._generate_review_comment(review_result)
+            partition = self._partition_issues(review_result.issues)
+            comment = self._generate_review_comment(review_result, partition)
             
             # 4. 发布评论（使用增量策略）
             if self.config['auto_comment']:
-                success = self._post_comment_incremental(project_id, mr_iid, comment, review_result)
+                success = self._post_comment_incremental(project_id, mr_iid, comment, review_result, mr)
                 if not success:
                     return False
             
-            # 5. 更新标签
-            if self.config['auto_label']:
-                self._update_labels(project_id, mr_iid, review_result)
-            
-            # 6. 更新状态（如果需要阻止合并）
-            if self.config['auto_block'] and review_result.status == ReviewStatus.FAILED:
-                self._block_merge(project_id, mr_iid, review_result)
-            
-            # 7. 记录审查的Commit
-            self._record_reviewed_commit(project_id, mr_iid)
+            # 5. 更新标签、阻止合并（如果需要）并记录审查的Commit
+            block = self.config['auto_block'] and review_result.status == ReviewStatus.FAILED
+            self._finalize_review(project_id, mr_iid, review_result, mr, block=block)
             
             self.logger.info("审查结果发布成功")
             return True
@@ -113,7 +250,108 @@ class GitLabMRInteractor:
             self.logger.error(f"发布审查结果失败: {e}")
             return False
     
-    def _should_publish_comment(self, project_id: str, mr_iid: int, review_result: ReviewResult) -> bool:
+    def _finalize_review(self, project_id: str, mr_iid: int, review_result: ReviewResult, mr, block: bool):
+        """
+        执行评论发布之后的收尾步骤
+        
+        标签更新与阻止合并都会修改MR标签，因此合并为一次保存；
+        记录审查commit只是本地数据库写入，依次执行即可
+        
+        Args:
+            project_id: 项目ID
+            mr_iid: 合并请求IID
+            review_result: 审查结果
+            mr: MR对象
+            block: 是否阻止合并
+        """
+        if self.config['auto_label']:
+            self._update_labels(project_id, mr_iid, review_result, mr, block=block)
+        elif block:
+            self._block_merge(project_id, mr_iid, review_result, mr)
+        self._record_reviewed_commit(project_id, mr_iid, mr)
+    
+    def _load_mr_snapshot(self, project_id: str, mr_iid: int):
+        """
+        获取最新的MR对象并预热评论历史缓存
+        
+        优先通过一次GraphQL查询同时拿到MR信息和最近评论，不可用时回退到REST
+        
+        Args:
+            project_id: 项目ID
+            mr_iid: 合并请求IID
+            
+        Returns:
+            MR对象
+        """
+        snapshot = self.gitlab_client.fetch_merge_request_snapshot(project_id, mr_iid)
+        if snapshot is None:
+            return self._get_mr(project_id, mr_iid, refresh=True)
+        
+        project = self.gitlab_client.gitlab.projects.get(project_id, lazy=True)
+        mr = ProjectMergeRequest(project.mergerequests, {
+            'iid': snapshot['iid'],
+            'title': snapshot['title'],
+            'sha': snapshot['sha'],
+            'labels': snapshot['labels']
+        })
+        
+        now = time.monotonic()
+        self._ctx[(project_id, mr_iid)] = (now, mr)
+        history = [
+            {
+                'id': note['id'],
+                'body': note['body'],
+                'created_at': note['created_at'],
+                'updated_at': note['updated_at']
+            }
+            for note in snapshot['notes'] if self._is_system_review_comment(note['body'])
+        ]
+        self._comment_history_cache[(project_id, mr_iid)] = (snapshot['sha'], now, history)
+        return mr
+    
+    def _get_mr(self, project_id: str, mr_iid: int, refresh: bool = False):
+        """
+        获取MR对象（带短期缓存）
+        
+        项目对象使用lazy方式获取，不会产生额外请求
+        
+        Args:
+            project_id: 项目ID
+            mr_iid: 合并请求IID
+            refresh: 是否忽略缓存重新获取
+            
+        Returns:
+            MR对象
+        """
+        key = (project_id, mr_iid)
+        now = time.monotonic()
+        cached = self._ctx.get(key)
+        if cached and not refresh and now - cached[0] < self.MR_CONTEXT_TTL:
+            return cached[1]
+        
+        project = self.gitlab_client.gitlab.projects.get(project_id, lazy=True)
+        mr = project.mergerequests.get(mr_iid)
+        self._ctx[key] = (now, mr)
+        return mr
+    
+    def invalidate(self, project_id: str, mr_iid: int):
+        """
+        清除指定MR的评论历史缓存（发布或更新评论后调用）
+        
+        Args:
+            project_id: 项目ID
+            mr_iid: 合并请求IID
+        """
+        self._comment_history_cache.pop((project_id, mr_iid), None)
+    
+    def _get_cached_history(self, project_id: str, mr_iid: int, sha: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+        """获取同一commit下未过期的评论历史缓存，没有时返回None"""
+        cached = self._comment_history_cache.get((project_id, mr_iid))
+        if cached and cached[0] == sha and time.monotonic() - cached[1] < self.COMMENT_HISTORY_TTL:
+            return cached[2]
+        return None
+    
+    def _should_publish_comment(self, project_id: str, mr_iid: int, review_result: ReviewResult, mr=None) -> bool:
         """检查是否需要发布评论"""
         try:
             # 如果启用强制重新评论，直接返回True
@@ -128,7 +366,7 @@ class GitLabMRInteractor:
             
             # 如果PASSED但没有问题，检查是否有历史评论
             if len(review_result.issues) == 0:
-                comment_history = self._get_comment_history(project_id, mr_iid)
+                comment_history = self._get_comment_history(project_id, mr_iid, mr)
                 if not comment_history:
                     # 首次审查且通过，发布初始评论
                     self.logger.info(f"MR {project_id}!{mr_iid} 首次审查通过，需要发布评论")
@@ -146,20 +384,39 @@ class GitLabMRInteractor:
             self.logger.error(f"检查是否需要发布评论失败: {e}")
             return True  # 如果检查失败，默认发布评论
     
-    def _generate_review_comment(self, review_result: ReviewResult) -> str:
+    def _partition_issues(self, issues: List[ReviewIssue]) -> IssuePartition:
+        """单次遍历问题列表，按严重程度和来源分组"""
+        partition = IssuePartition()
+        by_severity = partition.by_severity
+        by_source = partition.by_source
+        ai_count = 0
+        deductions = 0
+        
+        for issue in issues:
+            severity = issue.severity.value
+            by_severity[severity].append(issue)
+            deductions += _SEVERITY_WEIGHTS.get(severity, 1)
+            source = issue.source
+            by_source[source] = by_source.get(source, 0) + 1
+            if source.startswith('ai_'):
+                ai_count += 1
+        
+        partition.ai_issues_count = ai_count
+        partition.severity_deductions = deductions
+        return partition
+    
+    def _generate_review_comment(self, review_result: ReviewResult,
+                                 partition: Optional[IssuePartition] = None) -> str:
         """生成AI审查评论"""
+        if partition is None:
+            partition = self._partition_issues(review_result.issues)
         
         # 根据状态选择图标
-        status_icons = {
-            ReviewStatus.PASSED: "✅",
-            ReviewStatus.WARNING: "⚠️",
-            ReviewStatus.FAILED: "❌"
-        }
-        
-        icon = status_icons.get(review_result.status, "🔍")
+        icon = _STATUS_ICON.get(review_result.status, "🔍")
         
-        # 构建评论头部
-        comment = f"""
+        # 构建评论头部（各段落先收集到列表，最后统一拼接）
+        parts: List[str] = [_REVIEW_MARKER]
+        parts.append(f"""
 # {icon} AI智能代码审查报告
 
 **合并请求**: {review_result.mr_title} (!{review_result.mr_id})  
@@ -173,46 +430,42 @@ class GitLabMRInteractor:
 - **发现问题**: {len(review_result.issues)} 个
 - **AI分析文件**: {review_result.summary.get('files_analyzed', review_result.metadata['files_changed'])} 个
 
-"""
+""")
         
         # 添加AI分析亮点（修复逻辑矛盾）
         if 'ai_analysis_highlights' in review_result.summary:
             highlights = review_result.summary['ai_analysis_highlights']
-            comment += "## 🎯 AI分析亮点\n\n"
+            parts.append("## 🎯 AI分析亮点\n\n")
             
             # 统计总问题数
             total_issues_found = sum(highlights.values())
             
             if total_issues_found > 0:
                 # 有问题时显示具体分析结果
-                comment += f"- 🔍 **AI智能检查**: 完成了全面的代码分析，发现 {total_issues_found} 个需要关注的问题\n"
+                parts.append(f"- 🔍 **AI智能检查**: 完成了全面的代码分析，发现 {total_issues_found} 个需要关注的问题\n")
                 
                 if highlights.get('syntax_issues', 0) > 0:
-                    comment += f"- ✅ **语法检查**: 发现 {highlights['syntax_issues']} 个语法相关问题\n"
+                    parts.append(f"- ✅ **语法检查**: 发现 {highlights['syntax_issues']} 个语法相关问题\n")
                 if highlights.get('security_issues', 0) > 0:
-                    comment += f"- 🔒 **安全分析**: 发现 {highlights['security_issues']} 个安全风险\n"
+                    parts.append(f"- 🔒 **安全分析**: 发现 {highlights['security_issues']} 个安全风险\n")
                 if highlights.get('performance_issues', 0) > 0:
-                    comment += f"- ⚡ **性能分析**: 发现 {highlights['performance_issues']} 个性能问题\n"
+                    parts.append(f"- ⚡ **性能分析**: 发现 {highlights['performance_issues']} 个性能问题\n")
                 if highlights.get('logic_issues', 0) > 0:
-                    comment += f"- 🧠 **逻辑分析**: 发现 {highlights['logic_issues']} 个逻辑问题\n"
+                    parts.append(f"- 🧠 **逻辑分析**: 发现 {highlights['logic_issues']} 个逻辑问题\n")
                 if highlights.get('code_quality_issues', 0) > 0:
-                    comment += f"- 🎨 **代码质量**: 发现 {highlights['code_quality_issues']} 个质量问题\n"
+                    parts.append(f"- 🎨 **代码质量**: 发现 {highlights['code_quality_issues']} 个质量问题\n")
                 if highlights.get('best_practices_violations', 0) > 0:
-                    comment += f"- 📚 **最佳实践**: 发现 {highlights['best_practices_violations']} 个改进建议\n"
+                    parts.append(f"- 📚 **最佳实践**: 发现 {highlights['best_practices_violations']} 个改进建议\n")
             else:
                 # 没有问题时的积极表述
-                comment += "- 🤖 **AI分析确认**: 代码质量良好，AI智能检查未发现明显问题\n"
-                comment += "- ✅ **语法检查**: 通过，无语法错误\n"
-                comment += "- 🔒 **安全分析**: 通过，未发现安全风险\n"
-                comment += "- ⚡ **性能分析**: 通过，代码性能表现良好\n"
-                comment += "- 🧠 **逻辑分析**: 通过，代码逻辑结构清晰\n"
+                parts.append(_AI_HIGHLIGHTS_CLEAN)
         
-        comment += "\n### 📈 问题统计\n\n"
+        parts.append("\n### 📈 问题统计\n\n")
         
         # 添加文件分析详情（折叠式）
         if 'analysis_details' in review_result.summary:
             details = review_result.summary['analysis_details']
-            comment += "### 📁 文件分析详情\n\n"
+            parts.append("### 📁 文件分析详情\n\n")
             
             # 分析概要
             total_large = len(details.get('large_files', []))
@@ -220,61 +473,69 @@ class GitLabMRInteractor:
             total_skipped = len(details.get('skipped_files', []))
             total_analyzed = total_large + total_batch
             
-            comment += f"**分析概要**: 共分析 {total_analyzed} 个文件\n"
+            parts.append(f"**分析概要**: 共分析 {total_analyzed} 个文件\n")
             if total_large > 0:
-                comment += f"- 大文件单独分析: {total_large} 个\n"
+                parts.append(f"- 大文件单独分析: {total_large} 个\n")
             if total_batch > 0:
-                comment += f"- 批量分析: {total_batch} 个\n"
+                parts.append(f"- 批量分析: {total_batch} 个\n")
             if total_skipped > 0:
-                comment += f"- 跳过文件: {total_skipped} 个\n"
-            comment += "\n"
+                parts.append(f"- 跳过文件: {total_skipped} 个\n")
+            parts.append("\n")
             
-            # 优化的折叠详细信息
-            comment += '<details><summary><strong>🔍 点击查看详细文件列表</strong></summary>\n\n'
+            # 优化的折叠详细信息（没有任何文件时不输出；每个表格最多列出 _MAX_TABLE_ROWS 行）
+            if total_analyzed or total_skipped:
+                parts.append('<details><summary><strong>🔍 点击查看详细文件列表</strong></summary>\n\n')
             
-            if details.get('large_files', []):
-                comment += "#### 🔍 大文件分析\n"
-                comment += "| 文件路径 | 文件大小 | 分析类型 |\n"
-                comment += "|---------|---------|----------|\n"
-                for file_info in details['large_files']:
-                    size_kb = file_info['size'] / 1024
-                    comment += f"| `{file_info['path']}` | {size_kb:.1f} KB | 单独分析 |\n"
-                comment += "\n"
-            
-            if details.get('batch_files', []):
-                comment += "#### 📦 批量分析文件\n"
-                comment += "| 文件路径 | 文件大小 | 分析类型 |\n"
-                comment += "|---------|---------|----------|\n"
-                for file_info in details['batch_files']:
+            if total_large > 0:
+                parts.append("#### 🔍 大文件分析\n")
+                parts.append("| 文件路径 | 文件大小 | 分析类型 |\n")
+                parts.append("|---------|---------|----------|\n")
+                for file_info in details['large_files'][:_MAX_TABLE_ROWS]:
                     size_kb = file_info['size'] / 1024
-                    comment += f"| `{file_info['path']}` | {size_kb:.1f} KB | 批量分析 |\n"
-                comment += "\n"
+                    parts.append(f"| `{file_info['path']}` | {size_kb:.1f} KB | 单独分析 |\n")
+                if total_large > _MAX_TABLE_ROWS:
+                    parts.append(f"| *... 还有 {total_large - _MAX_TABLE_ROWS} 个文件未列出* | | |\n")
+                parts.append("\n")
             
-            if details.get('skipped_files', []):
-                comment += "#### ⏭️ 跳过的文件\n"
-                comment += "| 文件路径 | 跳过原因 |\n"
-                comment += "|---------|----------|\n"
-                for file_info in details['skipped_files']:
-                    comment += f"| `{file_info['path']}` | {file_info['reason']} |\n"
-                comment += "\n"
+            if total_batch > 0:
+                parts.append("#### 📦 批量分析文件\n")
+                parts.append("| 文件路径 | 文件大小 | 分析类型 |\n")
+                parts.append("|---------|---------|----------|\n")
+                for file_info in details['batch_files'][:_MAX_TABLE_ROWS]:
+                    size_kb = file_info['size'] / 1024
+                    parts.append(f"| `{file_info['path']}` | {size_kb:.1f} KB | 批量分析 |\n")
+                if total_batch > _MAX_TABLE_ROWS:
+                    parts.append(f"| *... 还有 {total_batch - _MAX_TABLE_ROWS} 个文件未列出* | | |\n")
+                parts.append("\n")
             
-            comment += "</details>\n\n"
+            if total_skipped > 0:
+                parts.append("#### ⏭️ 跳过的文件\n")
+                parts.append("| 文件路径 | 跳过原因 |\n")
+                parts.append("|---------|----------|\n")
+                for file_info in details['skipped_files'][:_MAX_TABLE_ROWS]:
+                    parts.append(f"| `{file_info['path']}` | {file_info['reason']} |\n")
+                if total_skipped > _MAX_TABLE_ROWS:
+                    parts.append(f"| *... 还有 {total_skipped - _MAX_TABLE_ROWS} 个文件未列出* | |\n")
+                parts.append("\n")
+            
+            if total_analyzed or total_skipped:
+                parts.append("</details>\n\n")
         
         # 添加严重程度统计
         severity_stats = review_result.summary.get('by_severity', {})
         has_severity_issues = any(count > 0 for count in severity_stats.values())
         
         if has_severity_issues:
-            comment += "| 严重程度 | 数量 |\n|---------|------|\n"
-            for severity in ['CRITICAL', 'ERROR', 'WARNING', 'INFO']:
+            parts.append("| 严重程度 | 数量 |\n|---------|------|\n")
+            for severity in _SEVERITY_ORDER:
                 count = severity_stats.get(severity, 0)
                 if count > 0:
-                    emoji = {'CRITICAL': '🔴', 'ERROR': '🟠', 'WARNING': '🟡', 'INFO': '🔵'}[severity]
-                    comment += f"| {emoji} {severity} | {count} |\n"
+                    emoji = _SEVERITY_EMOJI[severity]
+                    parts.append(f"| {emoji} {severity} | {count} |\n")
         else:
-            comment += "🎉 未发现任何代码问题！\n"
+            parts.append("🎉 未发现任何代码问题！\n")
         
-        comment += "\n### 🤖 AI分析器统计\n\n"
+        parts.append("\n### 🤖 AI分析器统计\n\n")
         
         # 添加AI分析器统计
         source_stats = review_result.summary.get('by_source', {})
@@ -282,115 +543,99 @@ class GitLabMRInteractor:
         
         if ai_analyzers:
             for source, count in ai_analyzers.items():
-                emoji_map = {
-                    'ai_syntax_checker': '✅',
-                    'ai_intelligent_review': '🧠',
-                    'ai_summary': '📊'
-                }
-                emoji = emoji_map.get(source, '🤖')
+                emoji = _ANALYZER_EMOJI.get(source, '🤖')
                 friendly_name = source.replace('ai_', '').replace('_', ' ').title()
-                comment += f"- {emoji} **{friendly_name}**: {count} 个问题\n"
+                parts.append(f"- {emoji} **{friendly_name}**: {count} 个问题\n")
         else:
-            comment += "- 🤖 **AI分析完成**: 所有检查均已通过\n"
+            parts.append("- 🤖 **AI分析完成**: 所有检查均已通过\n")
         
         # 添加问题详情（优化折叠结构）
         if review_result.issues:
-            comment += "\n## 🐛 AI发现问题详情\n\n"
+            parts.append("\n## 🐛 AI发现问题详情\n\n")
             
-            # 按严重程度分组
-            issues_by_severity = {}
-            for issue in review_result.issues:
-                severity = issue.severity.value
-                if severity not in issues_by_severity:
-                    issues_by_severity[severity] = []
-                issues_by_severity[severity].append(issue)
+            issues_by_severity = partition.by_severity
             
             # 输出问题（按严重程度排序）
-            for severity in ['CRITICAL', 'ERROR', 'WARNING', 'INFO']:
-                if severity in issues_by_severity:
-                    issues = issues_by_severity[severity]
-                    emoji = {'CRITICAL': '🔴', 'ERROR': '🟠', 'WARNING': '🟡', 'INFO': '🔵'}[severity]
+            for severity in _SEVERITY_ORDER:
+                issues = issues_by_severity[severity]
+                if not issues:
+                    continue
+                
+                emoji = _SEVERITY_EMOJI[severity]
+                
+                # 使用折叠结构优化长列表显示
+                if len(issues) <= 3:
+                    # 少量问题直接显示
+                    parts.append(f"### {emoji} {severity} 级问题 ({len(issues)}个)\n\n")
+                    for i, issue in enumerate(issues, 1):
+                        parts.append(self._format_issue_item(issue, i))
+                else:
+                    # 多个问题使用折叠结构
+                    parts.append(f"### {emoji} {severity} 级问题 ({len(issues)}个)\n\n")
+                    
+                    # 显示前2个问题
+                    for i, issue in enumerate(islice(issues, 2), 1):
+                        parts.append(self._format_issue_item(issue, i))
                     
-                    # 使用折叠结构优化长列表显示
-                    if len(issues) <= 3:
-                        # 少量问题直接显示
-                        comment += f"### {emoji} {severity} 级问题 ({len(issues)}个)\n\n"
-                        for i, issue in enumerate(issues, 1):
-                            comment += self._format_issue_item(issue, i)
-                    else:
-                        # 多个问题使用折叠结构
-                        comment += f"### {emoji} {severity} 级问题 ({len(issues)}个)\n\n"
+                    # 其余问题放在折叠区域
+                    if len(issues) > 2:
+                        parts.append(f'<details><summary><strong>📋 查看剩余 {len(issues) - 2} 个{severity}级问题</strong></summary>\n\n')
                         
-                        # 显示前2个问题
-                        for i, issue in enumerate(issues[:2], 1):
-                            comment += self._format_issue_item(issue, i)
+                        for i, issue in enumerate(islice(issues, 2, None), 3):
+                            parts.append(self._format_issue_item(issue, i))
                         
-                        # 其余问题放在折叠区域
-                        if len(issues) > 2:
-                            comment += f'<details><summary><strong>📋 查看剩余 {len(issues) - 2} 个{severity}级问题</strong></summary>\n\n'
-                            
-                            for i, issue in enumerate(issues[2:], 3):
-                                comment += self._format_issue_item(issue, i)
-                            
-                            comment += "</details>\n\n"
+                        parts.append("</details>\n\n")
         
         # 添加AI分析建议和下一步
-        comment += self._generate_recommendations(review_result)
+        parts.append(self._generate_recommendations(review_result, partition))
         
         # 添加报告生成信息
-        comment += f"\n---\n\n*🤖 此报告由自动审查系统生成于 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*"
+        parts.append(f"{_REPORT_FOOTER_PREFIX}{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*")
         
         # 限制评论长度
-        if len(comment) > self.config['max_comment_length']:
-            comment = comment[:self.config['max_comment_length']] + "\n\n*报告过长，已截断，请查看完整报告*"
+        comment = "".join(parts)
+        max_len = self.config['max_comment_length']
+        if len(comment) > max_len:
+            return comment[:max_len] + "\n\n*报告过长，已截断，请查看完整报告*"
         
         return comment
     
     def _format_issue_item(self, issue: ReviewIssue, index: int) -> str:
         """格式化单个问题项"""
         # AI分析器图标
-        analyzer_emoji = {
-            'ai_syntax_checker': '✅',
-            'ai_intelligent_review': '🧠',
-            'ai_summary': '📊'
-        }.get(issue.source, '🤖')
+        analyzer_emoji = _ANALYZER_EMOJI.get(issue.source, '🤖')
         
-        formatted = f"#### {index}. {analyzer_emoji} {issue.title}\n"
-        formatted += f"**类别**: {issue.category}  \n"
-        formatted += f"**AI分析器**: {issue.source}  \n"
+        parts = [f"#### {index}. {analyzer_emoji} {issue.title}\n"]
+        parts.append(f"**类别**: {issue.category}  \n")
+        parts.append(f"**AI分析器**: {issue.source}  \n")
         
         if issue.file_path:
-            formatted += f"**文件**: `{issue.file_path}`"
+            parts.append(f"**文件**: `{issue.file_path}`")
             if issue.line_number:
-                formatted += f" (第{issue.line_number}行)"
-            formatted += "  \n"
+                parts.append(f" (第{issue.line_number}行)")
+            parts.append("  \n")
         
-        formatted += f"**AI描述**: {issue.description}  \n"
+        parts.append(f"**AI描述**: {issue.description}  \n")
         
         if issue.suggestion:
-            formatted += f"**AI建议**: {issue.suggestion}  \n"
+            parts.append(f"**AI建议**: {issue.suggestion}  \n")
         
-        formatted += "\n---\n\n"
-        return formatted
+        parts.append("\n---\n\n")
+        return "".join(parts)
     
-    def _calculate_quality_score(self, issues: List[ReviewIssue]) -> float:
+    def _calculate_quality_score(self, issues: List[ReviewIssue],
+                                 partition: Optional[IssuePartition] = None) -> float:
         """计算质量得分"""
         if not issues:
             return 95.0
         
-        base_score = 100.0
-        total_deductions = 0.0
+        if partition is None:
+            partition = self._partition_issues(issues)
+        elif partition.quality_score is not None:
+            return partition.quality_score
         
-        severity_weights = {
-            'CRITICAL': 30,
-            'ERROR': 15,
-            'WARNING': 5,
-            'INFO': 1
-        }
-        
-        for issue in issues:
-            deduction = severity_weights.get(issue.severity.value, 1)
-            total_deductions += deduction
+        base_score = 100.0
+        total_deductions = float(partition.severity_deductions)
         
         # 问题数量惩罚
         if len(issues) > 10:
@@ -399,128 +644,100 @@ class GitLabMRInteractor:
             total_deductions += (len(issues) - 5) * 1
         
         final_score = max(0, base_score - total_deductions)
-        return round(final_score, 1)
+        partition.quality_score = round(final_score, 1)
+        return partition.quality_score
     
-    def _generate_recommendations(self, review_result: ReviewResult) -> str:
+    def _generate_recommendations(self, review_result: ReviewResult,
+                                  partition: Optional[IssuePartition] = None) -> str:
         """生成AI审查建议（改进版本）"""
+        if partition is None:
+            partition = self._partition_issues(review_result.issues)
         
-        recommendations = "## 🎯 AI分析建议和下一步\n\n"
+        parts = ["## 🎯 AI分析建议和下一步\n\n"]
         
         # 计算质量得分用于更精准的建议
-        quality_score = self._calculate_quality_score(review_result.issues)
+        quality_score = self._calculate_quality_score(review_result.issues, partition)
         total_issues = len(review_result.issues)
-        critical_issues = [issue for issue in review_result.issues if issue.severity.value == 'CRITICAL']
-        error_issues = [issue for issue in review_result.issues if issue.severity.value == 'ERROR']
+        critical_issues = partition.by_severity['CRITICAL']
+        error_issues = partition.by_severity['ERROR']
         
         # 根据状态和具体问题情况给出建议
         if review_result.status == ReviewStatus.PASSED:
             if total_issues == 0:
-                recommendations += "✅ **AI分析确认：代码质量优秀，推荐合并**\n\n"
-                recommendations += "- 🤖 AI智能检查：所有质量检查均已通过\n"
-                recommendations += "- 🔒 安全分析：未发现安全风险\n"
-                recommendations += "- ⚡ 性能分析：代码性能表现良好\n"
-                recommendations += "- 🧠 逻辑分析：代码逻辑结构清晰\n"
-                recommendations += f"- 📊 质量评分：{quality_score}/100 (优秀)\n"
-                recommendations += "- ✅ **推荐操作**：可以直接合并\n"
+                parts.append(_RECOMMEND_PASSED_HEAD)
+                parts.append(f"- 📊 质量评分：{quality_score}/100 (优秀)\n")
+                parts.append("- ✅ **推荐操作**：可以直接合并\n")
             else:
-                recommendations += f"✅ **AI分析：代码质量良好，发现 {total_issues} 个轻微问题，可以合并**\n\n"
-                recommendations += f"- 🔍 发现问题：{total_issues} 个（主要为提升建议）\n"
-                recommendations += "- 💡 这些问题不影响功能，但修复后可以提升代码质量\n"
-                recommendations += f"- 📊 质量评分：{quality_score}/100\n"
-                recommendations += "- ✅ **推荐操作**：可以合并，建议后续优化\n"
+                parts.append(f"✅ **AI分析：代码质量良好，发现 {total_issues} 个轻微问题，可以合并**\n\n")
+                parts.append(f"- 🔍 发现问题：{total_issues} 个（主要为提升建议）\n")
+                parts.append("- 💡 这些问题不影响功能，但修复后可以提升代码质量\n")
+                parts.append(f"- 📊 质量评分：{quality_score}/100\n")
+                parts.append("- ✅ **推荐操作**：可以合并，建议后续优化\n")
             
         elif review_result.status == ReviewStatus.WARNING:
-            recommendations += f"⚠️ **AI分析：发现 {total_issues} 个问题，建议修复后合并**\n\n"
-            warning_issues = [issue for issue in review_result.issues if issue.severity.value == 'WARNING']
-            recommendations += f"- ⚠️ WARNING级问题：{len(warning_issues)} 个\n"
-            recommendations += "- 🔧 这些问题可能影响代码质量或维护性\n"
-            recommendations += f"- 📊 质量评分：{quality_score}/100\n"
-            recommendations += "- 🔄 **推荐操作**：修复主要问题后合并\n"
+            parts.append(f"⚠️ **AI分析：发现 {total_issues} 个问题，建议修复后合并**\n\n")
+            warning_issues = partition.by_severity['WARNING']
+            parts.append(f"- ⚠️ WARNING级问题：{len(warning_issues)} 个\n")
+            parts.append("- 🔧 这些问题可能影响代码质量或维护性\n")
+            parts.append(f"- 📊 质量评分：{quality_score}/100\n")
+            parts.append("- 🔄 **推荐操作**：修复主要问题后合并\n")
             
         else:  # FAILED
-            recommendations += f"❌ **AI分析：发现 {len(critical_issues + error_issues)} 个严重问题，禁止合并**\n\n"
+            parts.append(f"❌ **AI分析：发现 {len(critical_issues + error_issues)} 个严重问题，禁止合并**\n\n")
             
             if critical_issues:
-                recommendations += f"- 🔴 CRITICAL级问题：{len(critical_issues)} 个（必须修复）\n"
+                parts.append(f"- 🔴 CRITICAL级问题：{len(critical_issues)} 个（必须修复）\n")
             if error_issues:
-                recommendations += f"- 🟠 ERROR级问题：{len(error_issues)} 个（必须修复）\n"
+                parts.append(f"- 🟠 ERROR级问题：{len(error_issues)} 个（必须修复）\n")
             
-            recommendations += f"- 📊 质量评分：{quality_score}/100 (需要改进)\n"
-            recommendations += "- 🚫 **严禁合并**：存在阻止性问题\n"
-            recommendations += "- 🔧 **必须操作**：修复所有CRITICAL和ERROR级问题\n"
+            parts.append(f"- 📊 质量评分：{quality_score}/100 (需要改进)\n")
+            parts.append(_RECOMMEND_FAILED_TAIL)
             
             # 列出优先修复的问题
             high_priority_issues = critical_issues + error_issues
             if high_priority_issues:
-                recommendations += "\n**🔴 优先修复问题（按重要性排序）：**\n"
+                parts.append("\n**🔴 优先修复问题（按重要性排序）：**\n")
                 for i, issue in enumerate(high_priority_issues[:5], 1):
-                    analyzer_emoji = {
-                        'ai_syntax_checker': '✅',
-                        'ai_intelligent_review': '🧠', 
-                        'ai_summary': '📊'
-                    }.get(issue.source, '🤖')
+                    analyzer_emoji = _ANALYZER_EMOJI.get(issue.source, '🤖')
                     file_info = f" ({issue.file_path})" if issue.file_path else ""
-                    recommendations += f"{i}. {analyzer_emoji} {issue.severity.value}: {issue.title}{file_info}\n"
+                    parts.append(f"{i}. {analyzer_emoji} {issue.severity.value}: {issue.title}{file_info}\n")
                 
                 if len(high_priority_issues) > 5:
-                    recommendations += f"   *... 还有 {len(high_priority_issues) - 5} 个严重问题需要修复*\n"
+                    parts.append(f"   *... 还有 {len(high_priority_issues) - 5} 个严重问题需要修复*\n")
         
         # 添加AI驱动的通用建议
-        recommendations += "\n### 🤖 AI智能建议\n"
-        recommendations += "- 🧪 运行完整的单元测试和集成测试\n"
-        recommendations += "- 📚 更新相关技术文档和API文档\n"
-        recommendations += "- 🎯 遵循团队编码规范和最佳实践\n"
-        recommendations += "- 🔍 考虑进行代码覆盖率分析\n"
-        recommendations += "- ⚡ 进行性能基准测试\n"
-        recommendations += "- 📋 检查是否有遗留的TODO或FIXME注释\n"
+        parts.append(_AI_GENERIC_SUGGESTIONS)
         
         # 添加AI分析质量评估（改进版本）
-        recommendations += "\n### 🏆 AI分析质量评估\n"
+        parts.append("\n### 🏆 AI分析质量评估\n")
         
         # AI覆盖度分析
-        ai_issues = [issue for issue in review_result.issues if issue.source.startswith('ai_')]
-        ai_coverage = len(ai_issues) / len(review_result.issues) if review_result.issues else 1.0
-        
-        recommendations += f"- 📊 代码质量评分：{quality_score}/100"
-        if quality_score >= 90:
-            recommendations += " (优秀)\n"
-        elif quality_score >= 80:
-            recommendations += " (良好)\n"
-        elif quality_score >= 70:
-            recommendations += " (一般)\n"
-        else:
-            recommendations += " (需要改进)\n"
+        ai_coverage = partition.ai_issues_count / total_issues if total_issues else 1.0
         
-        recommendations += f"- 🤖 AI分析覆盖度：{ai_coverage:.1%}\n"
+        parts.append(f"- 📊 代码质量评分：{quality_score}/100")
+        parts.append(_QUALITY_LABELS[bisect_right(_QUALITY_THRESHOLDS, quality_score)])
+        
+        parts.append(f"- 🤖 AI分析覆盖度：{ai_coverage:.1%}\n")
         
         # 基于实际状态的推荐
-        if review_result.status == ReviewStatus.PASSED:
-            recommendations += "- ✅ 推荐合并：是（质量达标）\n"
-        elif review_result.status == ReviewStatus.WARNING:
-            recommendations += "- ⚠️ 推荐合并：建议修复问题后\n"
-        else:
-            recommendations += "- ❌ 推荐合并：否（存在阻止性问题）\n"
-        
-        # AI置信度评估
-        if ai_coverage >= 0.8 and len(review_result.issues) > 0:
-            recommendations += "- 🎯 AI分析置信度：高（覆盖全面）\n"
-        elif ai_coverage >= 0.6:
-            recommendations += "- 🎯 AI分析置信度：中高（覆盖较好）\n"
-        elif len(review_result.issues) == 0:
-            recommendations += "- 🎯 AI分析置信度：高（无问题发现）\n"
-        else:
-            recommendations += "- 🎯 AI分析置信度：中等（建议人工复核）\n"
+        parts.append(_MERGE_VERDICT.get(review_result.status, _MERGE_VERDICT_BLOCKED))
         
-        return recommendations
+        # AI置信度评估（无问题时覆盖度为100%，但不算"覆盖全面"）
+        level = bisect_right(_AI_CONFIDENCE_THRESHOLDS, ai_coverage)
+        if not total_issues:
+            level = min(level, 1)
+        parts.append(_AI_CONFIDENCE_LABELS[level])
+        
+        return "".join(parts)
     
-    def _post_comment(self, project_id: str, mr_iid: int, comment: str) -> bool:
+    def _post_comment(self, project_id: str, mr_iid: int, comment: str, mr=None) -> bool:
         """发布评论到MR"""
         try:
-            project = self.gitlab_client.gitlab.projects.get(project_id)
-            mr = project.mergerequests.get(mr_iid)
+            mr = mr or self._get_mr(project_id, mr_iid)
             
             # 发布评论
             mr.notes.create({'body': comment})
+            self.invalidate(project_id, mr_iid)
             
             self.logger.info(f"评论已发布到MR: {project_id}!{mr_iid}")
             return True
@@ -529,11 +746,11 @@ class GitLabMRInteractor:
             self.logger.error(f"发布评论失败: {e}")
             return False
     
-    def _update_labels(self, project_id: str, mr_iid: int, review_result: ReviewResult):
-        """更新MR标签"""
+    def _update_labels(self, project_id: str, mr_iid: int, review_result: ReviewResult, mr=None,
+                       block: bool = False):
+        """更新MR标签（block为True时同时添加阻止合并标签）"""
         try:
-            project = self.gitlab_client.gitlab.projects.get(project_id)
-            mr = project.mergerequests.get(mr_iid)
+            mr = mr or self._get_mr(project_id, mr_iid)
             
             # 获取现有标签
             current_labels = mr.labels or []
@@ -556,20 +773,25 @@ class GitLabMRInteractor:
             # 添加新标签
             new_labels.extend(review_labels[review_result.status])
             
+            # 需要阻止合并时一并添加阻止标签，只保存一次
+            if block and 'merge:blocked' not in new_labels:
+                new_labels.append('merge:blocked')
+            
             # 更新标签
             mr.labels = new_labels
             mr.save()
             
             self.logger.info(f"MR标签已更新: {new_labels}")
+            if block:
+                self.logger.info(f"MR合并已阻止: {project_id}!{mr_iid}")
             
         except Exception as e:
             self.logger.warning(f"更新MR标签失败: {e}")
     
-    def _block_merge(self, project_id: str, mr_iid: int, review_result: ReviewResult):
+    def _block_merge(self, project_id: str, mr_iid: int, review_result: ReviewResult, mr=None):
         """阻止MR合并"""
         try:
-            project = self.gitlab_client.gitlab.projects.get(project_id)
-            mr = project.mergerequests.get(mr_iid)
+            mr = mr or self._get_mr(project_id, mr_iid)
             
             # 添加阻止合并的标签
             current_labels = mr.labels or []
@@ -591,21 +813,21 @@ class GitLabMRInteractor:
     def get_review_history(self, project_id: str, mr_iid: int) -> List[Dict[str, Any]]:
         """获取MR的审查历史"""
         try:
-            project = self.gitlab_client.gitlab.projects.get(project_id)
-            mr = project.mergerequests.get(mr_iid)
+            mr = self._get_mr(project_id, mr_iid)
             
-            # 获取所有讨论
-            discussions = mr.discussions.list(all=True)
+            # 按页流式读取讨论（每页100条），不一次性加载全部
+            discussions = mr.discussions.list(iterator=True, per_page=100)
             
             # 筛选出审查相关的讨论
             review_discussions = []
             for discussion in discussions:
                 for note in discussion.attributes.get('notes', []):
-                    if note.get('body', '').startswith(('✅ 代码审查报告', '⚠️ 代码审查报告', '❌ 代码审查报告')):
+                    body = note.get('body', '')
+                    if body.startswith(_REVIEW_MARKER) or body.startswith(_REVIEW_COMMENT_PREFIXES):
                         review_discussions.append({
                             'id': note.get('id'),
                             'author': note.get('author', {}),
-                            'body': note.get('body', ''),
+                            'body': body,
                             'created_at': note.get('created_at'),
                             'system': note.get('system', False)
                         })
@@ -618,18 +840,18 @@ class GitLabMRInteractor:
     
     # ========== 基于Commit的增量审查核心方法 ==========
     
-    def _should_perform_review(self, project_id: str, mr_iid: int) -> bool:
+    def _should_perform_review(self, project_id: str, mr_iid: int, mr=None) -> bool:
         """检查是否需要执行审查（基于Commit和评论状态）"""
         try:
             # 如果启用强制重新评论，直接执行审查
             if self.config['force_recomment']:
-                self.logger.info(f"MR {project_id}!{mr_iid} 启用强制重新评论，执行审查")
+                self.logger.info("MR %s!%s 启用强制重新评论，执行审查", project_id, mr_iid)
                 return True
             
             # 获取MR的最新commit
-            latest_commit = self._get_latest_commit(project_id, mr_iid)
+            latest_commit = self._get_latest_commit(project_id, mr_iid, mr)
             if not latest_commit:
-                self.logger.warning(f"无法获取MR {project_id}!{mr_iid} 的最新commit")
+                self.logger.warning("无法获取MR %s!%s 的最新commit", project_id, mr_iid)
                 return True  # 如果获取失败，默认执行审查
             
             # 获取上次审查的commit
@@ -637,56 +859,57 @@ class GitLabMRInteractor:
             
             # 如果没有审查记录，需要审查
             if not last_reviewed_commit:
-                self.logger.info(f"MR {project_id}!{mr_iid} 首次审查")
+                self.logger.info("MR %s!%s 首次审查", project_id, mr_iid)
                 return True
             
             # 如果commit有变化，需要审查
             if latest_commit != last_reviewed_commit:
-                self.logger.info(f"MR {project_id}!{mr_iid} 代码有变更 (commit: {latest_commit[:8]})")
+                self.logger.info("MR %s!%s 代码有变更 (commit: %.8s)", project_id, mr_iid, latest_commit)
                 return True
             
             # 代码无变更，检查是否有系统评论
-            has_system_comments = self._has_system_review_comments(project_id, mr_iid)
+            has_system_comments = self._has_system_review_comments(project_id, mr_iid, mr)
             
             if has_system_comments:
-                self.logger.info(f"MR {project_id}!{mr_iid} 代码无变更且有系统评论，跳过审查")
+                self.logger.info("MR %s!%s 代码无变更且有系统评论，跳过审查", project_id, mr_iid)
                 return False
             else:
-                self.logger.info(f"MR {project_id}!{mr_iid} 代码无变更但无系统评论，执行审查")
+                self.logger.info("MR %s!%s 代码无变更但无系统评论，执行审查", project_id, mr_iid)
                 return True
             
         except Exception as e:
             self.logger.error(f"检查是否需要审查失败: {e}")
             return True  # 如果检查失败，默认执行审查
     
-    def _has_system_review_comments(self, project_id: str, mr_iid: int) -> bool:
+    def _has_system_review_comments(self, project_id: str, mr_iid: int, mr=None) -> bool:
         """检查MR是否有系统审查评论"""
         try:
-            comment_history = self._get_comment_history(project_id, mr_iid)
-            self.logger.info(f"MR {project_id}!{mr_iid} 找到 {len(comment_history)} 条系统评论")
+            comment_history = self._get_comment_history(project_id, mr_iid, mr)
+            self.logger.info("MR %s!%s 找到 %d 条系统评论", project_id, mr_iid, len(comment_history))
             
-            if comment_history:
-                for i, comment in enumerate(comment_history):
-                    self.logger.info(f"  评论 {i+1}: {comment['body'][:100]}...")
+            # 逐条输出评论摘要只在INFO级别开启时执行
+            if comment_history and self.logger.isEnabledFor(logging.INFO):
+                for i, comment in enumerate(comment_history, 1):
+                    self.logger.info("  评论 %d: %.100s...", i, comment['body'])
             
             return len(comment_history) > 0
         except Exception as e:
             self.logger.warning(f"检查系统评论失败: {e}")
             return False  # 如果检查失败，认为没有评论
     
-    def _get_latest_commit(self, project_id: str, mr_iid: int) -> Optional[str]:
+    def _get_latest_commit(self, project_id: str, mr_iid: int, mr=None) -> Optional[str]:
         """获取MR的最新commit"""
         try:
-            project = self.gitlab_client.gitlab.projects.get(project_id)
-            mr = project.mergerequests.get(mr_iid)
+            mr = mr or self._get_mr(project_id, mr_iid)
             
-            # 获取MR的所有commit
-            commits_obj = mr.commits()
-            commits = list(commits_obj)  # 转换为列表
-            if commits:
-                return commits[0].id  # 返回最新的commit
+            # MR对象自带源分支HEAD的sha，无需再请求commit列表
+            sha = getattr(mr, 'sha', None)
+            if sha:
+                return sha
             
-            return None
+            # 旧版GitLab不返回sha时，只取第一页（每页1条）的第一个commit
+            latest = next(iter(mr.commits(per_page=1)), None)
+            return latest.id if latest else None
             
         except Exception as e:
             self.logger.error(f"获取最新commit失败: {e}")
@@ -695,92 +918,69 @@ class GitLabMRInteractor:
     def _get_last_reviewed_commit(self, project_id: str, mr_iid: int) -> Optional[str]:
         """获取上次审查的commit"""
         try:
-            # 从本地存储读取上次审查的commit
-            commit_file = self._get_commit_record_file(project_id, mr_iid)
-            
-            if os.path.exists(commit_file):
-                with open(commit_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return data.get('last_reviewed_commit')
-            
-            return None
-            
+            return self.review_state.get_last_reviewed_commit(project_id, mr_iid)
         except Exception as e:
             self.logger.error(f"获取上次审查commit失败: {e}")
             return None
     
-    def _record_reviewed_commit(self, project_id: str, mr_iid: int):
+    def _record_reviewed_commit(self, project_id: str, mr_iid: int, mr=None):
         """记录已审查的commit"""
         try:
             # 获取最新commit
-            latest_commit = self._get_latest_commit(project_id, mr_iid)
+            latest_commit = self._get_latest_commit(project_id, mr_iid, mr)
             if not latest_commit:
                 return
             
-            # 准备保存的数据
-            record_data = {
-                'project_id': project_id,
-                'mr_iid': mr_iid,
-                'last_reviewed_commit': latest_commit,
-                'reviewed_at': datetime.now().isoformat(),
-                'review_count': self._get_review_count(project_id, mr_iid) + 1
-            }
-            
-            # 保存到文件
-            commit_file = self._get_commit_record_file(project_id, mr_iid)
-            os.makedirs(os.path.dirname(commit_file), exist_ok=True)
-            
-            with open(commit_file, 'w', encoding='utf-8') as f:
-                json.dump(record_data, f, indent=2, ensure_ascii=False)
+            self.review_state.record(project_id, mr_iid, latest_commit, datetime.now().isoformat())
             
             self.logger.info(f"已记录审查commit: {latest_commit[:8]}")
             
         except Exception as e:
             self.logger.error(f"记录审查commit失败: {e}")
     
-    def _get_commit_record_file(self, project_id: str, mr_iid: int) -> str:
-        """获取commit记录文件路径"""
-        return os.path.join(project_root, 'output', 'review_commits', f'{project_id}_{mr_iid}.json')
-    
     def _get_review_count(self, project_id: str, mr_iid: int) -> int:
         """获取审查次数"""
         try:
-            commit_file = self._get_commit_record_file(project_id, mr_iid)
-            
-            if os.path.exists(commit_file):
-                with open(commit_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return data.get('review_count', 0)
-            
-            return 0
-            
+            return self.review_state.get_review_count(project_id, mr_iid)
         except Exception as e:
             self.logger.error(f"获取审查次数失败: {e}")
             return 0
     
-    def _post_comment_incremental(self, project_id: str, mr_iid: int, comment: str, review_result: ReviewResult) -> bool:
+    def _post_comment_incremental(self, project_id: str, mr_iid: int, comment: str, review_result: ReviewResult, mr=None) -> bool:
         """增量评论策略"""
         try:
+            # 整个增量流程共用同一个MR对象
+            mr = mr or self._get_mr(project_id, mr_iid)
+            
             # 如果启用强制重新评论，直接更新最新评论（而不是发布新评论）
             if self.config['force_recomment']:
                 self.logger.info(f"MR {project_id}!{mr_iid} 启用强制重新评论，更新最新评论")
-                return self._update_latest_comment(project_id, mr_iid, comment)
+                return self._update_latest_comment(project_id, mr_iid, comment, mr)
             
-            # 获取评论历史
-            comment_history = self._get_comment_history(project_id, mr_iid)
+            # 只需要最新的一条系统评论
+            latest_comment = self._get_latest_system_comment(project_id, mr_iid, mr)
             
             # 如果是首次评论，直接发布
-            if not comment_history:
-                return self._post_new_comment(project_id, mr_iid, comment)
+            if not latest_comment:
+                return self._post_new_comment(project_id, mr_iid, comment, mr)
+            
+            # 除生成时间外内容完全相同，无需再次更新
+            if self._comment_digest(comment) == self._comment_digest(latest_comment['body']):
+                self.logger.info(f"MR {project_id}!{mr_iid} 评论内容未变化，跳过评论")
+                return True
+            
+            # 评论与审查结果的统计信息只提取一次，供下面两个判断共用
+            comment_info = self._extract_comment_info(latest_comment['body'])
+            current_info = self._extract_review_result_info(review_result)
             
             # 检查是否需要更新现有评论
-            if self._should_update_comment(comment_history, review_result):
-                return self._update_latest_comment(project_id, mr_iid, comment)
+            if self._should_update_comment(latest_comment, review_result, current_info, comment_info):
+                return self._update_latest_comment(project_id, mr_iid, comment, mr, latest_comment)
             
             # 检查是否有新的问题需要评论
-            new_issues = self._get_new_issues(comment_history, review_result)
+            new_issues = self._get_new_issues(latest_comment, review_result, current_info, comment_info)
             if new_issues:
-                return self._post_new_comment(project_id, mr_iid, comment)
+                return self._post_new_comment(project_id, mr_iid, comment, mr)
             
             # 没有新的内容，跳过评论
             self.logger.info(f"MR {project_id}!{mr_iid} 无新内容，跳过评论")
@@ -788,13 +988,18 @@ class GitLabMRInteractor:
             
         except Exception as e:
             self.logger.error(f"增量评论失败: {e}")
-            return self._post_new_comment(project_id, mr_iid, comment)  # 失败时回退到直接发布
+            return self._post_new_comment(project_id, mr_iid, comment, mr)  # 失败时回退到直接发布
     
-    def _get_comment_history(self, project_id: str, mr_iid: int) -> List[Dict[str, Any]]:
+    def _get_comment_history(self, project_id: str, mr_iid: int, mr=None) -> List[Dict[str, Any]]:
         """获取评论历史"""
         try:
-            project = self.gitlab_client.gitlab.projects.get(project_id)
-            mr = project.mergerequests.get(mr_iid)
+            mr = mr or self._get_mr(project_id, mr_iid)
+            
+            # 同一commit下的评论历史直接复用缓存
+            sha = getattr(mr, 'sha', None)
+            cached = self._get_cached_history(project_id, mr_iid, sha)
+            if cached is not None:
+                return cached
             
             # 获取系统评论
             notes = mr.notes.list(order_by='created_at', sort='desc', per_page=50)
@@ -809,33 +1014,67 @@ class GitLabMRInteractor:
                         'updated_at': note.updated_at
                     })
             
+            self._comment_history_cache[(project_id, mr_iid)] = (sha, time.monotonic(), system_comments)
             return system_comments
             
         except Exception as e:
             self.logger.error(f"获取评论历史失败: {e}")
             return []
     
-    def _should_update_comment(self, comment_history: List[Dict[str, Any]], review_result: ReviewResult) -> bool:
+    def _get_latest_system_comment(self, project_id: str, mr_iid: int, mr=None) -> Optional[Dict[str, Any]]:
+        """
+        获取最新的一条系统审查评论
+        
+        已缓存评论历史时直接取第一条；否则按创建时间倒序分页读取，找到第一条即停止
+        
+        Returns:
+            评论字典（格式同 _get_comment_history 的元素），不存在时返回None
+        """
+        try:
+            mr = mr or self._get_mr(project_id, mr_iid)
+            
+            cached = self._get_cached_history(project_id, mr_iid, getattr(mr, 'sha', None))
+            if cached is not None:
+                return cached[0] if cached else None
+            
+            for note in mr.notes.list(order_by='created_at', sort='desc', per_page=20, iterator=True):
+                if self._is_system_review_comment(note.body):
+                    return {
+                        'id': note.id,
+                        'body': note.body,
+                        'created_at': note.created_at,
+                        'updated_at': note.updated_at
+                    }
+            return None
+            
+        except Exception as e:
+            self.logger.error(f"获取最新系统评论失败: {e}")
+            return None
+    
+    def _should_update_comment(self, latest_comment: Optional[Dict[str, Any]], review_result: ReviewResult,
+                               current_info: Optional[Dict[str, Any]] = None,
+                               comment_info: Optional[Dict[str, Any]] = None) -> bool:
         """判断是否应该更新现有评论"""
-        if not comment_history:
+        if not latest_comment:
             return False
         
-        # 获取最新评论
-        latest_comment = comment_history[0]
-        
         # 提取评论信息
-        comment_info = self._extract_comment_info(latest_comment['body'])
-        current_info = self._extract_review_result_info(review_result)
+        comment_info = comment_info or self._extract_comment_info(latest_comment['body'])
+        current_info = current_info or self._extract_review_result_info(review_result)
         
         # 如果状态或问题数量发生变化，则更新
         return (comment_info['status'] != current_info['status'] or
                 comment_info['total_issues'] != current_info['total_issues'] or
                 comment_info['critical_issues'] != current_info['critical_issues'])
     
+    @staticmethod
+    def _comment_digest(comment_body: str) -> bytes:
+        """计算评论内容摘要（不含审查时间行和带生成时间的页脚）"""
+        content = _REVIEW_TIME_LINE_RE.sub('', comment_body.partition(_REPORT_FOOTER_PREFIX)[0], count=1)
+        return hashlib.blake2s(content.encode('utf-8')).digest()
+    
     def _extract_comment_info(self, comment_body: str) -> Dict[str, Any]:
         """从评论中提取信息"""
-        import re
-        
         info = {
             'status': None,
             'total_issues': 0,
@@ -845,51 +1084,43 @@ class GitLabMRInteractor:
         }
         
         # 提取状态
-        if '✅' in comment_body:
-            info['status'] = 'PASSED'
-        elif '⚠️' in comment_body:
-            info['status'] = 'WARNING'
-        elif '❌' in comment_body:
-            info['status'] = 'FAILED'
-        
-        # 提取问题数量
-        total_match = re.search(r'总计 (\d+) 个问题', comment_body)
-        if total_match:
-            info['total_issues'] = int(total_match.group(1))
-        
-        critical_match = re.search(r'严重: (\d+)', comment_body)
-        if critical_match:
-            info['critical_issues'] = int(critical_match.group(1))
-        
-        error_match = re.search(r'错误: (\d+)', comment_body)
-        if error_match:
-            info['error_issues'] = int(error_match.group(1))
-        
-        warning_match = re.search(r'警告: (\d+)', comment_body)
-        if warning_match:
-            info['warning_issues'] = int(warning_match.group(1))
+        for marker, status in _STATUS_MARKERS:
+            if marker in comment_body:
+                info['status'] = status
+                break
+        
+        # 提取问题数量（每项以第一次出现为准）
+        found = set()
+        for m in _RE_COUNTS.finditer(comment_body):
+            key = m.lastgroup
+            if key not in found:
+                found.add(key)
+                info[key] = int(m.group(key))
         
         return info
     
     def _extract_review_result_info(self, review_result: ReviewResult) -> Dict[str, Any]:
         """从审查结果中提取信息"""
+        # 单次遍历按严重程度计数（severity为枚举，按其值统计）
+        counts = Counter(issue.severity.value for issue in review_result.issues)
         return {
             'status': review_result.status.value,
             'total_issues': len(review_result.issues),
-            'critical_issues': len([i for i in review_result.issues if i.severity in ['CRITICAL', 'BLOCKER']]),
-            'error_issues': len([i for i in review_result.issues if i.severity == 'ERROR']),
-            'warning_issues': len([i for i in review_result.issues if i.severity == 'WARNING'])
+            'critical_issues': counts['CRITICAL'] + counts['BLOCKER'],
+            'error_issues': counts['ERROR'],
+            'warning_issues': counts['WARNING']
         }
     
-    def _get_new_issues(self, comment_history: List[Dict[str, Any]], review_result: ReviewResult) -> List[ReviewIssue]:
+    def _get_new_issues(self, latest_comment: Optional[Dict[str, Any]], review_result: ReviewResult,
+                        current_info: Optional[Dict[str, Any]] = None,
+                        comment_info: Optional[Dict[str, Any]] = None) -> List[ReviewIssue]:
         """获取新的问题"""
         # 简化实现：如果状态变化，则认为有新问题
-        if not comment_history:
+        if not latest_comment:
             return review_result.issues
         
-        latest_comment = comment_history[0]
-        comment_info = self._extract_comment_info(latest_comment['body'])
-        current_info = self._extract_review_result_info(review_result)
+        comment_info = comment_info or self._extract_comment_info(latest_comment['body'])
+        current_info = current_info or self._extract_review_result_info(review_result)
         
         if comment_info['status'] != current_info['status']:
             return review_result.issues
@@ -898,19 +1129,17 @@ class GitLabMRInteractor:
     
     def _is_system_review_comment(self, comment_body: str) -> bool:
         """判断是否为系统审查评论"""
-        return ('🤖' in comment_body or 
-                '自动审查' in comment_body or 
-                'AI审查' in comment_body or
-                'SonarQube' in comment_body)
+        return (comment_body.startswith(_REVIEW_MARKER) or
+                _LEGACY_REVIEW_COMMENT_RE.search(comment_body) is not None)
     
-    def _post_new_comment(self, project_id: str, mr_iid: int, comment: str) -> bool:
+    def _post_new_comment(self, project_id: str, mr_iid: int, comment: str, mr=None) -> bool:
         """发布新评论"""
         try:
-            project = self.gitlab_client.gitlab.projects.get(project_id)
-            mr = project.mergerequests.get(mr_iid)
+            mr = mr or self._get_mr(project_id, mr_iid)
             
             # 发布评论
             mr.notes.create({'body': comment})
+            self.invalidate(project_id, mr_iid)
             
             self.logger.info(f"评论发布成功: {project_id}!{mr_iid}")
             return True
@@ -919,27 +1148,27 @@ class GitLabMRInteractor:
             self.logger.error(f"发布评论失败: {e}")
             return False
     
-    def _update_latest_comment(self, project_id: str, mr_iid: int, comment: str) -> bool:
-        """更新最新评论"""
+    def _update_latest_comment(self, project_id: str, mr_iid: int, comment: str, mr=None,
+                               latest_comment: Optional[Dict[str, Any]] = None) -> bool:
+        """更新最新评论（latest_comment 为已查到的最新系统评论，未提供时自动查找）"""
         try:
-            project = self.gitlab_client.gitlab.projects.get(project_id)
-            mr = project.mergerequests.get(mr_iid)
-            
-            # 获取系统评论
-            notes = mr.notes.list(order_by='created_at', sort='desc')
+            mr = mr or self._get_mr(project_id, mr_iid)
             
             # 找到最新的系统评论
-            for note in notes:
-                if self._is_system_review_comment(note.body):
-                    # 更新评论
-                    note.body = comment
-                    note.save()
-                    
-                    self.logger.info(f"评论更新成功: {project_id}!{mr_iid}")
-                    return True
+            latest_comment = latest_comment or self._get_latest_system_comment(project_id, mr_iid, mr)
             
             # 如果没有找到系统评论，则发布新评论
-            return self._post_new_comment(project_id, mr_iid, comment)
+            if not latest_comment:
+                return self._post_new_comment(project_id, mr_iid, comment, mr)
+            
+            # 已知评论ID，直接更新，无需再次获取
+            note = mr.notes.get(latest_comment['id'], lazy=True)
+            note.body = comment
+            note.save()
+            self.invalidate(project_id, mr_iid)
+            
+            self.logger.info(f"评论更新成功: {project_id}!{mr_iid}")
+            return True
             
         except Exception as e:
             self.logger.error(f"更新评论失败: {e}")
@@ -1025,9 +1254,9 @@ class ReviewResultProcessor:
                 'metadata': review_result.metadata
             }
             
-            # 保存到文件
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(save_data, f, indent=2, ensure_ascii=False)
+            # 保存到文件（orjson直接输出UTF-8字节）
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(save_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
             
             self.logger.info(f"审查结果已保存到: {filepath}")
             
@@ -1047,14 +1276,45 @@ class ReviewResultProcessor:
             'source': issue.source
         }
 
+def _load_review_result(path: str) -> ReviewResult:
+    """从JSON文件加载审查结果"""
+    with open(path, 'r', encoding='utf-8') as f:
+        review_data = json.load(f)
+    
+    issues = []
+    for issue_data in review_data['issues']:
+        issue = ReviewIssue(
+            severity=ReviewSeverity(issue_data['severity']) if issue_data['severity'] in [s.value for s in ReviewSeverity] else ReviewSeverity.INFO,
+            category=issue_data['category'],
+            title=issue_data['title'],
+            description=issue_data['description'],
+            file_path=issue_data.get('file_path'),
+            line_number=issue_data.get('line_number'),
+            suggestion=issue_data.get('suggestion'),
+            source=issue_data['source']
+        )
+        issues.append(issue)
+    
+    return ReviewResult(
+        mr_id=review_data['mr_iid'],
+        mr_title=review_data['mr_title'],
+        mr_author=review_data.get('mr_author', 'Unknown'),
+        review_time=datetime.fromisoformat(review_data['review_time']),
+        status=ReviewStatus(review_data['status']),
+        issues=issues,
+        summary=review_data['summary'],
+        metadata=review_data['metadata']
+    )
+
 def main():
     """命令行入口"""
     parser = argparse.ArgumentParser(description='GitLab MR 审查结果处理器')
     parser.add_argument('--project-id', required=True, help='GitLab项目ID')
-    parser.add_argument('--mr-iid', required=True, type=int, help='合并请求IID')
-    parser.add_argument('--review-result', help='审查结果JSON文件路径')
+    parser.add_argument('--mr-iid', required=True, type=int, nargs='+', help='合并请求IID（可指定多个）')
+    parser.add_argument('--review-result', nargs='+', help='审查结果JSON文件路径（与--mr-iid一一对应）')
     parser.add_argument('--action', choices=['publish', 'history'], default='publish', help='操作类型')
     parser.add_argument('--force-recomment', action='store_true', help='强制重新评论（忽略已有评论）')
+    parser.add_argument('--max-workers', type=int, default=8, help='多个MR时的最大并发数 (默认: 8)')
     parser.add_argument('--log-level', default='INFO', help='日志级别')
     
     args = parser.parse_args()
@@ -1070,53 +1330,43 @@ def main():
             processor.set_force_recomment(True)
             logger.info("启用强制重新评论模式")
         
+        # 各MR之间互不依赖，耗时主要在GitLab请求上，多个MR时并发处理
+        workers = max(1, min(args.max_workers, len(args.mr_iid)))
+        
         if args.action == 'publish':
-            # 如果有审查结果文件，加载它
-            if args.review_result:
-                with open(args.review_result, 'r', encoding='utf-8') as f:
-                    review_data = json.load(f)
-                
-                # 创建ReviewResult对象
-                from automation.mr_review_engine import ReviewResult, ReviewStatus, ReviewIssue
-                from datetime import datetime
-                
-                issues = []
-                for issue_data in review_data['issues']:
-                    issue = ReviewIssue(
-                        severity=ReviewStatus(issue_data['severity']) if issue_data['severity'] in [s.value for s in ReviewStatus] else ReviewStatus.INFO,
-                        category=issue_data['category'],
-                        title=issue_data['title'],
-                        description=issue_data['description'],
-                        file_path=issue_data.get('file_path'),
-                        line_number=issue_data.get('line_number'),
-                        suggestion=issue_data.get('suggestion'),
-                        source=issue_data['source']
-                    )
-                    issues.append(issue)
-                
-                review_result = ReviewResult(
-                    mr_id=review_data['mr_iid'],
-                    mr_title=review_data['mr_title'],
-                    mr_author=review_data.get('mr_author', 'Unknown'),
-                    review_time=datetime.fromisoformat(review_data['review_time']),
-                    status=ReviewStatus(review_data['status']),
-                    issues=issues,
-                    summary=review_data['summary'],
-                    metadata=review_data['metadata']
-                )
-                
-                success = processor.process_and_publish(args.project_id, args.mr_iid, review_result)
-                print(f"发布结果: {'成功' if success else '失败'}")
-            else:
+            if not args.review_result:
                 print("请提供审查结果文件路径")
+                return
+            if len(args.review_result) != len(args.mr_iid):
+                print("审查结果文件数量必须与MR数量一致")
+                sys.exit(1)
+            
+            def publish(mr_iid: int, path: str) -> bool:
+                try:
+                    return processor.process_and_publish(args.project_id, mr_iid, _load_review_result(path))
+                except Exception as e:
+                    logger.error(f"处理MR {mr_iid} 失败: {e}")
+                    return False
+            
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='mr-publish') as executor:
+                results = list(executor.map(publish, args.mr_iid, args.review_result))
+            
+            for mr_iid, success in zip(args.mr_iid, results):
+                print(f"MR {mr_iid} 发布结果: {'成功' if success else '失败'}")
                 
         elif args.action == 'history':
             # 获取审查历史
-            history = processor.gitlab_interactor.get_review_history(args.project_id, args.mr_iid)
-            print(f"MR {args.mr_iid} 的审查历史:")
-            for i, record in enumerate(history, 1):
-                print(f"  {i}. {record['created_at']} - {record['author']['name']}")
-                print(f"     状态: {'通过' if '✅' in record['body'] else '警告' if '⚠️' in record['body'] else '失败'}")
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='mr-history') as executor:
+                histories = list(executor.map(
+                    lambda mr_iid: processor.gitlab_interactor.get_review_history(args.project_id, mr_iid),
+                    args.mr_iid
+                ))
+            
+            for mr_iid, history in zip(args.mr_iid, histories):
+                print(f"MR {mr_iid} 的审查历史:")
+                for i, record in enumerate(history, 1):
+                    print(f"  {i}. {record['created_at']} - {record['author']['name']}")
+                    print(f"     状态: {'通过' if '✅' in record['body'] else '警告' if '⚠️' in record['body'] else '失败'}")
     
     except Exception as e:
         logger.error(f"处理失败: {e}")
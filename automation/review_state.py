@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+MR审查状态存储
+使用单个SQLite数据库（WAL模式）记录每个MR最近一次审查的commit
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from typing import Dict, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviewed (
+    project_id  TEXT    NOT NULL,
+    mr_iid      INTEGER NOT NULL,
+    sha         TEXT    NOT NULL,
+    reviewed_at TEXT    NOT NULL,
+    count       INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (project_id, mr_iid)
+)
+"""
+
+_UPSERT = """
+INSERT INTO reviewed (project_id, mr_iid, sha, reviewed_at, count)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (project_id, mr_iid) DO UPDATE SET
+    sha = excluded.sha,
+    reviewed_at = excluded.reviewed_at,
+    count = count + 1
+"""
+
+
+class ReviewStateStore:
+    """MR审查状态存储（同一数据库文件在进程内共享一个连接）"""
+
+    _connections: Dict[str, sqlite3.Connection] = {}
+    _connections_guard = threading.Lock()
+
+    def __init__(self, db_path: str, legacy_dir: Optional[str] = None):
+        """
+        初始化状态存储
+
+        Args:
+            db_path: SQLite数据库文件路径
+            legacy_dir: 旧版按MR保存的JSON记录目录，首次查询时按需导入
+        """
+        self.db_path = os.path.abspath(db_path)
+        self.legacy_dir = legacy_dir
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """获取（并按路径复用）数据库连接"""
+        with self._connections_guard:
+            conn = self._connections.get(self.db_path)
+            if conn is None:
+                os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+                conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(_SCHEMA)
+                self._connections[self.db_path] = conn
+            return conn
+
+    def _fetch(self, project_id: str, mr_iid: int) -> Optional[Tuple[str, int]]:
+        """查询 (sha, count)，数据库无记录时尝试导入旧版JSON记录"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT sha, count FROM reviewed WHERE project_id = ? AND mr_iid = ?",
+                (str(project_id), mr_iid)
+            ).fetchone()
+        if row is None:
+            row = self._import_legacy(project_id, mr_iid)
+        return row
+
+    def _import_legacy(self, project_id: str, mr_iid: int) -> Optional[Tuple[str, int]]:
+        """导入旧版 {project_id}_{mr_iid}.json 记录"""
+        if not self.legacy_dir:
+            return None
+
+        legacy_file = os.path.join(self.legacy_dir, f'{project_id}_{mr_iid}.json')
+        try:
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        sha = data.get('last_reviewed_commit')
+        if not sha:
+            return None
+        count = data.get('review_count', 1)
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO reviewed (project_id, mr_iid, sha, reviewed_at, count) VALUES (?, ?, ?, ?, ?)",
+                (str(project_id), mr_iid, sha, data.get('reviewed_at', ''), count)
+            )
+        return sha, count
+
+    def get_last_reviewed_commit(self, project_id: str, mr_iid: int) -> Optional[str]:
+        """获取上次审查的commit"""
+        row = self._fetch(project_id, mr_iid)
+        return row[0] if row else None
+
+    def get_review_count(self, project_id: str, mr_iid: int) -> int:
+        """获取审查次数"""
+        row = self._fetch(project_id, mr_iid)
+        return row[1] if row else 0
+
+    def record(self, project_id: str, mr_iid: int, sha: str, reviewed_at: str):
+        """
+        记录已审查的commit（审查次数自动加1）
+
+        Args:
+            project_id: 项目ID
+            mr_iid: 合并请求IID
+            sha: 审查的commit
+            reviewed_at: 审查时间（ISO格式）
+        """
+        # 先确保旧版记录已导入，保证审查次数连续
+        if self.legacy_dir:
+            self._fetch(project_id, mr_iid)
+        with self._lock:
+            self.conn.execute(_UPSERT, (str(project_id), mr_iid, sha, reviewed_at, 1))
@@ -17,6 +17,7 @@ class GitLabConfig:
     project_id: Optional[str] = None
     timeout: int = 30
     verify_ssl: bool = True
+    http_cache_ttl: int = 0  # GET响应缓存有效期（秒），0表示不启用，需安装requests-cache
     
     @classmethod
     def from_env(cls) -> 'GitLabConfig':
@@ -26,7 +27,8 @@ class GitLabConfig:
             token=os.getenv('GITLAB_TOKEN', ''),
             project_id=os.getenv('GITLAB_PROJECT_ID'),
             timeout=int(os.getenv('GITLAB_TIMEOUT', '30')),
-            verify_ssl=os.getenv('GITLAB_VERIFY_SSL', 'true').lower() == 'true'
+            verify_ssl=os.getenv('GITLAB_VERIFY_SSL', 'true').lower() == 'true',
+            http_cache_ttl=int(os.getenv('GITLAB_HTTP_CACHE_TTL', '0'))
         )
     
     @classmethod
@@ -7,7 +7,7 @@
 import os
 import sys
 import pymysql
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Iterator
 from contextlib import contextmanager
 from datetime import datetime
 
@@ -64,6 +64,28 @@ class DatabaseClient:
                 cursor.execute(sql, params)
                 return cursor.fetchall()
     
+    def iter_query(self, sql: str, params: Optional[tuple] = None,
+                   batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        流式执行查询SQL（服务端游标 + fetchmany），适用于大结果集导出
+        
+        Args:
+            sql: SQL语句
+            params: 参数元组
+            batch_size: 每批从服务端拉取的行数
+            
+        Yields:
+            查询结果行
+        """
+        with self.get_connection() as conn:
+            with conn.cursor(pymysql.cursors.SSDictCursor) as cursor:
+                cursor.execute(sql, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from rows
+    
     def execute_update(self, sql: str, params: Optional[tuple] = None) -> int:
         """
         执行更新SQL
@@ -84,13 +106,17 @@ class DatabaseClient:
     # 脚本相关查询
     def get_all_scripts(self) -> List[Dict[str, Any]]:
         """获取所有脚本"""
+        return list(self.iter_all_scripts())
+    
+    def iter_all_scripts(self) -> Iterator[Dict[str, Any]]:
+        """流式获取所有脚本"""
         sql = """
         SELECT id, name, description, file_path, default_working_dir, 
                default_arguments, created_at, updated_at
         FROM scripts
         ORDER BY created_at DESC
         """
-        return self.execute_query(sql)
+        return self.iter_query(sql)
     
     def get_script_by_id(self, script_id: int) -> Optional[Dict[str, Any]]:
         """根据ID获取脚本"""
@@ -131,6 +157,10 @@ class DatabaseClient:
     
     def get_recent_executions(self, limit: int = 100) -> List[Dict[str, Any]]:
         """获取最近的执行记录"""
+        return list(self.iter_recent_executions(limit))
+    
+    def iter_recent_executions(self, limit: int = 100) -> Iterator[Dict[str, Any]]:
+        """流式获取最近的执行记录"""
         sql = """
         SELECT e.id, e.script_id, s.name as script_name, e.status,
                e.start_time, e.end_time, e.log_path
@@ -139,7 +169,24 @@ class DatabaseClient:
         ORDER BY e.start_time DESC
         LIMIT %s
         """
-        return self.execute_query(sql, (limit,))
+        return self.iter_query(sql, (limit,))
+    
+    def get_executions_since(self, cutoff: datetime, limit: int = 50000) -> List[Dict[str, Any]]:
+        """获取指定时间之后的执行记录"""
+        return list(self.iter_executions_since(cutoff, limit))
+    
+    def iter_executions_since(self, cutoff: datetime, limit: int = 50000) -> Iterator[Dict[str, Any]]:
+        """流式获取指定时间之后的执行记录（时间过滤在数据库端完成）"""
+        sql = """
+        SELECT e.id, e.script_id, s.name as script_name, e.status,
+               e.start_time, e.end_time, e.log_path
+        FROM executions e
+        JOIN scripts s ON e.script_id = s.id
+        WHERE e.start_time > %s
+        ORDER BY e.start_time DESC
+        LIMIT %s
+        """
+        return self.iter_query(sql, (cutoff, limit))
     
     def get_execution_stats(self, days: int = 30) -> Dict[str, Any]:
         """获取执行统计信息"""
@@ -178,6 +225,10 @@ class DatabaseClient:
     # 定时任务相关查询
     def get_scheduled_tasks(self) -> List[Dict[str, Any]]:
         """获取所有定时任务"""
+        return list(self.iter_scheduled_tasks())
+    
+    def iter_scheduled_tasks(self) -> Iterator[Dict[str, Any]]:
+        """流式获取所有定时任务"""
         sql = """
         SELECT st.id, st.script_id, s.name as script_name, st.cron_expression,
                st.enabled, st.created_at, st.updated_at
@@ -185,7 +236,7 @@ class DatabaseClient:
         JOIN scripts s ON st.script_id = s.id
         ORDER BY st.created_at DESC
         """
-        return self.execute_query(sql)
+        return self.iter_query(sql)
     
     def get_active_scheduled_tasks(self) -> List[Dict[str, Any]]:
         """获取启用的定时任务"""
@@ -202,12 +253,16 @@ class DatabaseClient:
     # 用户相关查询
     def get_users(self) -> List[Dict[str, Any]]:
         """获取所有用户"""
+        return list(self.iter_users())
+    
+    def iter_users(self) -> Iterator[Dict[str, Any]]:
+        """流式获取所有用户"""
         sql = """
         SELECT id, username, created_at, updated_at
         FROM users
         ORDER BY created_at DESC
         """
-        return self.execute_query(sql)
+        return self.iter_query(sql)
     
     def test_connection(self) -> bool:
         """测试数据库连接"""
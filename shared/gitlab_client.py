@@ -8,10 +8,13 @@ import os
 import sys
 import re
 import time
+import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple
 import gitlab
+from requests.adapters import HTTPAdapter
 from gitlab.exceptions import (
+    GitlabError,
     GitlabAuthenticationError,
     GitlabGetError,
     GitlabCreateError,
@@ -24,21 +27,41 @@ sys.path.append(project_root)
 from config.gitlab_config import GitLabConfig, get_default_config
 from shared.utils import setup_logging
 
+# 可选依赖：requests-cache 为GET请求提供跨进程持久化的HTTP缓存
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+# 连接池大小，需覆盖批量流水线的并发线程数，避免连接被反复新建
+HTTP_POOL_MAXSIZE = 32
+
+# 项目等元数据缓存有效期（秒）
+METADATA_CACHE_TTL = 60
+
+# HTTP缓存中始终不缓存的地址：MR及其评论、提交需要实时数据（调用方已按commit自行缓存），
+# 也因此无需在POST/PUT后清理缓存
+HTTP_CACHE_BYPASS_URLS = ('*/merge_requests*', '*/repository/*')
+
 class GitLabClient:
     """GitLab API客户端"""
     
-    def __init__(self, config: Optional[GitLabConfig] = None, log_level: str = 'INFO'):
+    def __init__(self, config: Optional[GitLabConfig] = None, log_level: str = 'INFO',
+                 logger: Optional[logging.Logger] = None):
         """
         初始化GitLab客户端
         
         Args:
             config: GitLab配置，默认从环境变量获取
             log_level: 日志级别，默认INFO
+            logger: 已配置好的logger，提供时不再重新配置日志
         """
         self.config = config or get_default_config()
-        self.logger = setup_logging(level=log_level)
+        self.logger = logger or setup_logging(level=log_level)
         self._gitlab = None
         self._project = None
+        # 元数据缓存: key -> (获取时间, 值)
+        self._metadata_cache: Dict[Any, Tuple[float, Any]] = {}
     
     def _parse_datetime_safe(self, date_str: Optional[str]) -> Optional[datetime]:
         """安全解析日期时间字符串"""
@@ -65,10 +88,60 @@ class GitLabClient:
                 private_token=self.config.token,
                 timeout=self.config.timeout,
                 ssl_verify=self.config.verify_ssl,
-                keep_base_url=True  # 保持用户提供的基础URL
+                keep_base_url=True,  # 保持用户提供的基础URL
+                session=self._build_http_session()
             )
+            # 扩大 keep-alive 连接池，并发请求复用已建立的连接
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_MAXSIZE)
+            self._gitlab.session.mount('https://', adapter)
+            self._gitlab.session.mount('http://', adapter)
         return self._gitlab
-    
+
+    def _build_http_session(self):
+        """
+        按配置创建带HTTP缓存的会话
+
+        Returns:
+            requests-cache 会话；未启用缓存或未安装 requests-cache 时返回None（使用默认会话）
+        """
+        ttl = getattr(self.config, 'http_cache_ttl', 0)
+        if ttl <= 0:
+            return None
+        if requests_cache is None:
+            self.logger.warning("未安装requests-cache，GitLab HTTP缓存未启用")
+            return None
+
+        return requests_cache.CachedSession(
+            os.path.join(project_root, 'output', 'gitlab_http_cache'),
+            backend='sqlite',
+            expire_after=ttl,
+            allowable_methods=('GET',),
+            urls_expire_after={pattern: requests_cache.DO_NOT_CACHE for pattern in HTTP_CACHE_BYPASS_URLS}
+        )
+
+    def _cached(self, key: Any, ttl: float, fetch: Callable[[], Any]) -> Any:
+        """
+        带有效期的缓存查询，未命中或已过期时调用 fetch 获取并缓存
+
+        Args:
+            key: 缓存键
+            ttl: 有效期（秒）
+            fetch: 获取数据的函数
+        """
+        now = time.monotonic()
+        cached = self._metadata_cache.get(key)
+        if cached is not None and now - cached[0] < ttl:
+            return cached[1]
+
+        value = fetch()
+        self._metadata_cache[key] = (now, value)
+        return value
+
+    def _get_project(self, pid: str):
+        """获取项目对象，同一项目在缓存有效期内只请求一次"""
+        return self._cached(('project', str(pid)), METADATA_CACHE_TTL,
+                            lambda: self.gitlab.projects.get(pid))
+
     @property
     def project(self):
         """获取当前项目"""
@@ -127,7 +200,7 @@ class GitLabClient:
             if not pid:
                 raise ValueError("未指定项目ID")
             
-            project = self.gitlab.projects.get(pid)
+            project = self._get_project(pid)
             return {
                 'id': project.id,
                 'name': project.name,
@@ -171,7 +244,7 @@ class GitLabClient:
             if not pid:
                 raise ValueError("未指定项目ID")
             
-            project = self.gitlab.projects.get(pid)
+            project = self._get_project(pid)
             
             # 构建查询参数
             params = {
@@ -294,7 +367,7 @@ class GitLabClient:
             if not pid:
                 raise ValueError("未指定项目ID")
             
-            project = self.gitlab.projects.get(pid)
+            project = self._get_project(pid)
             mr = project.mergerequests.get(merge_request_iid)
             
             # 获取提交列表
@@ -415,7 +488,7 @@ class GitLabClient:
             if not pid:
                 raise ValueError("未指定项目ID")
             
-            project = self.gitlab.projects.get(pid)
+            project = self._get_project(pid)
             mr = project.mergerequests.get(merge_request_iid)
             
             # 获取提交列表（保持原逻辑）
@@ -849,7 +922,7 @@ class GitLabClient:
             if not pid:
                 raise ValueError("未指定项目ID")
             
-            project = self.gitlab.projects.get(pid)
+            project = self._get_project(pid)
             
             # 获取仓库文件树
             items = project.repository_tree(path=path, ref=ref, recursive=True, all=True)
@@ -885,7 +958,7 @@ class GitLabClient:
             if not pid:
                 raise ValueError("未指定项目ID")
             
-            project = self.gitlab.projects.get(pid)
+            project = self._get_project(pid)
             
             # 获取文件
             file = project.files.get(file_path=file_path, ref=ref)
@@ -900,6 +973,167 @@ class GitLabClient:
             self.logger.error(f"获取文件内容失败 {file_path}: {e}")
             return None
 
+    def _format_created_merge_request(self, mr) -> Dict[str, Any]:
+        """格式化新建/查询到的MR为返回字典"""
+        return {
+            'iid': mr.iid,
+            'id': mr.id,
+            'title': mr.title,
+            'description': mr.description,
+            'state': mr.state,
+            'source_branch': mr.source_branch,
+            'target_branch': mr.target_branch,
+            'web_url': mr.web_url,
+            'created_at': mr.created_at,
+            'author': {
+                'id': mr.author.get('id'),
+                'name': mr.author.get('name'),
+                'username': mr.author.get('username')
+            },
+            'draft': getattr(mr, 'draft', False),
+            'work_in_progress': getattr(mr, 'work_in_progress', False),
+            'merge_status': getattr(mr, 'merge_status', 'unknown')
+        }
+
+    def fetch_merge_request_snapshot(self,
+                                     project_id: Optional[str],
+                                     merge_request_iid: int,
+                                     notes_limit: int = 50) -> Optional[Dict[str, Any]]:
+        """
+        通过一次GraphQL查询获取MR快照（sha、标题、标签和最近的评论）
+
+        Args:
+            project_id: 项目ID或项目完整路径，默认使用配置中的项目ID
+            merge_request_iid: 合并请求IID
+            notes_limit: 获取最近评论的数量
+
+        Returns:
+            快照字典，评论按创建时间倒序；查询失败时返回None，调用方应回退到REST接口。
+            只有GraphQL接口本身不可用（接口不存在或查询不被支持）时，才在缓存有效期内不再尝试GraphQL
+        """
+        unavailable_key = ('graphql_unavailable',)
+        cached = self._metadata_cache.get(unavailable_key)
+        if cached is not None and time.monotonic() - cached[0] < METADATA_CACHE_TTL:
+            return None
+
+        try:
+            pid = str(project_id or self.config.project_id or '')
+            if not pid:
+                raise ValueError("未指定项目ID")
+
+            # 数字ID使用全局ID查询，路径使用fullPath查询
+            if pid.isdigit():
+                selector = 'projects(ids: [$project]) { nodes { ...mr } }'
+                project_ref = f'gid://gitlab/Project/{pid}'
+            else:
+                selector = 'project(fullPath: $project) { ...mr }'
+                project_ref = pid
+
+            query = (
+                'query($project: ID!, $iid: String!, $notes: Int!) { ' + selector + ' } '
+                'fragment mr on Project { mergeRequest(iid: $iid) { '
+                'iid title sha labels { nodes { title } } '
+                'notes(last: $notes) { nodes { id body system createdAt updatedAt } } } }'
+            )
+            try:
+                response = self.gitlab.http_post(
+                    f'{self.gitlab.url}/api/graphql',
+                    post_data={
+                        'query': query,
+                        'variables': {'project': project_ref, 'iid': str(merge_request_iid), 'notes': notes_limit}
+                    }
+                )
+            except GitlabError as e:
+                # 404/405 表示实例未提供GraphQL接口，其他错误（网络、5xx等）只影响本次查询
+                if e.response_code in (404, 405):
+                    self._metadata_cache[unavailable_key] = (time.monotonic(), None)
+                raise
+
+            # 非JSON响应或查询报错（旧版GitLab缺少字段等）说明当前实例不支持该查询
+            if not isinstance(response, dict) or response.get('errors'):
+                self._metadata_cache[unavailable_key] = (time.monotonic(), None)
+                errors = response.get('errors') if isinstance(response, dict) else response
+                raise GitlabError(f"GraphQL查询不可用: {errors}")
+
+            data = response.get('data') or {}
+            if 'projects' in data:
+                nodes = (data['projects'] or {}).get('nodes') or []
+                project_data = nodes[0] if nodes else None
+            else:
+                project_data = data.get('project')
+            mr = (project_data or {}).get('mergeRequest')
+            if not mr:
+                raise GitlabError(f"未找到合并请求: {pid}!{merge_request_iid}")
+
+            notes = [
+                {
+                    # 全局ID形如 gid://gitlab/Note/123，REST接口使用末尾的数字ID
+                    'id': int(note['id'].rsplit('/', 1)[-1]),
+                    'body': note.get('body') or '',
+                    'system': note.get('system', False),
+                    'created_at': note.get('createdAt'),
+                    'updated_at': note.get('updatedAt')
+                }
+                for note in reversed(mr['notes']['nodes'])
+            ]
+
+            return {
+                'iid': int(mr['iid']),
+                'title': mr.get('title'),
+                'sha': mr.get('sha'),
+                'labels': [label['title'] for label in mr['labels']['nodes']],
+                'notes': notes
+            }
+
+        except Exception as e:
+            self.logger.debug(f"GraphQL获取MR快照失败，将使用REST接口: {e}")
+            return None
+
+    def find_open_merge_request(self,
+                                project_id: Optional[str] = None,
+                                source_branch: str = '',
+                                target_branch: str = 'main') -> Dict[str, Any]:
+        """
+        查询源分支到目标分支已存在的开放MR
+
+        未找到的结果在缓存有效期内复用，重试时无需再次请求；创建MR后缓存失效。
+
+        Args:
+            project_id: 项目ID，默认使用配置中的项目ID
+            source_branch: 源分支名称
+            target_branch: 目标分支名称
+
+        Returns:
+            找到时返回MR信息字典（格式同 create_merge_request），否则返回空字典
+        """
+        try:
+            pid = project_id or self.config.project_id
+            if not pid:
+                raise ValueError("未指定项目ID")
+
+            key = ('open_mr', str(pid), source_branch, target_branch)
+            cached = self._metadata_cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < METADATA_CACHE_TTL:
+                return {}
+
+            project = self.gitlab.projects.get(pid, lazy=True)
+            mrs = project.mergerequests.list(
+                state='opened',
+                source_branch=source_branch,
+                target_branch=target_branch,
+                per_page=1,
+                get_all=False
+            )
+            if mrs:
+                return self._format_created_merge_request(mrs[0])
+
+            self._metadata_cache[key] = (time.monotonic(), None)
+            return {}
+
+        except Exception as e:
+            self.logger.warning(f"查询已存在的合并请求失败: {e}")
+            return {}
+
     def create_merge_request(self,
                             project_id: Optional[str] = None,
                             source_branch: str = '',
@@ -951,8 +1185,8 @@ class GitLabClient:
 
             self.logger.info(f"创建合并请求: {source_branch} -> {target_branch}, 标题: {title[:50]}...")
 
-            # 获取项目
-            project = self.gitlab.projects.get(pid)
+            # 懒加载项目，只用于拼接接口路径，不额外请求项目详情
+            project = self.gitlab.projects.get(pid, lazy=True)
 
             # 构建创建参数
             data = {
@@ -986,26 +1220,11 @@ class GitLabClient:
             # 创建MR
             mr = project.mergerequests.create(data)
 
+            # 已存在开放MR的否定缓存失效
+            self._metadata_cache.pop(('open_mr', str(pid), source_branch, target_branch), None)
+
             # 格式化返回结果
-            result = {
-                'iid': mr.iid,
-                'id': mr.id,
-                'title': mr.title,
-                'description': mr.description,
-                'state': mr.state,
-                'source_branch': mr.source_branch,
-                'target_branch': mr.target_branch,
-                'web_url': mr.web_url,
-                'created_at': mr.created_at,
-                'author': {
-                    'id': mr.author.get('id'),
-                    'name': mr.author.get('name'),
-                    'username': mr.author.get('username')
-                },
-                'draft': getattr(mr, 'draft', False),
-                'work_in_progress': getattr(mr, 'work_in_progress', False),
-                'merge_status': getattr(mr, 'merge_status', 'unknown')
-            }
+            result = self._format_created_merge_request(mr)
 
             self.logger.info(f"创建合并请求成功: !{mr.iid} ({mr.title})")
             return result
@@ -1049,8 +1268,8 @@ class GitLabClient:
 
             self.logger.info(f"准备审批并合并 MR: !{merge_request_iid}")
 
-            # 获取项目和MR
-            project = self.gitlab.projects.get(pid)
+            # 获取MR（项目懒加载，不额外请求项目详情）
+            project = self.gitlab.projects.get(pid, lazy=True)
             mr = project.mergerequests.get(merge_request_iid)
 
             # 检查MR状态
@@ -1062,30 +1281,17 @@ class GitLabClient:
                     'mr_state': mr.state
                 }
 
-            # 检查是否需要审批
-            # GitLab中，某些用户可能需要先审批才能合并
-            # 但这不是必须的，取决于项目设置
+            # 尝试审批
+            # GitLab中，某些用户可能需要先审批才能合并，但这不是必须的，取决于项目设置。
+            # 直接调用审批接口，已审批或无权审批时由GitLab返回错误，省去查询当前用户和审批状态的请求
             try:
-                # 获取当前用户信息
-                current_user = self.gitlab.auth()
-                user_id = current_user.get('id') if current_user else None
-
-                if user_id:
-                    # 尝试审批（如果需要）
-                    try:
-                        # 检查是否已经审批过
-                        approvals = project.mergerequests.get(merge_request_iid, lazy=True).approvals()
-
-                        # 如果需要审批且用户尚未审批
-                        if hasattr(approvals, 'user_has_approved') and not approvals.user_has_approved:
-                            self.logger.info(f"用户 {user_id} 审批 MR !{merge_request_iid}")
-                            project.mergerequests.approve(merge_request_iid)
-                            self.logger.info(f"审批成功")
-                    except Exception as approval_error:
-                        self.logger.warning(f"审批步骤跳过或失败: {approval_error}")
-                        # 审批失败不阻断合并流程，继续尝试合并
-            except Exception as e:
-                self.logger.warning(f"检查审批状态失败: {e}")
+                self.logger.info(f"审批 MR !{merge_request_iid}")
+                # 审批接口返回审批状态而非MR，用懒加载对象调用以免覆盖 mr 的属性
+                project.mergerequests.get(merge_request_iid, lazy=True).approve()
+                self.logger.info(f"审批成功")
+            except Exception as approval_error:
+                self.logger.warning(f"审批步骤跳过或失败: {approval_error}")
+                # 审批失败不阻断合并流程，继续尝试合并
 
             # 合并参数
             merge_data = {}
@@ -1093,8 +1299,10 @@ class GitLabClient:
             if merge_commit_message:
                 merge_data['merge_commit_message'] = merge_commit_message
 
-            if sha:
-                merge_data['sha'] = sha
+            # 未指定SHA时锁定为刚获取到的源分支HEAD，源分支在此期间被推送时GitLab返回409，放弃本次合并
+            head_sha = sha or getattr(mr, 'sha', None)
+            if head_sha:
+                merge_data['sha'] = head_sha
 
             if merge_when_pipeline_succeeds:
                 merge_data['merge_when_pipeline_succeeds'] = True
@@ -1140,6 +1348,15 @@ class GitLabClient:
                 result = mr.merge(**merge_data)
                 self.logger.info(f"合并调用成功")
             except Exception as merge_error:
+                # 源分支HEAD已不是刚才获取到的提交，不合并未经确认的新提交
+                if isinstance(merge_error, GitlabError) and merge_error.response_code == 409 and 'sha' in merge_data:
+                    self.logger.error(f"源分支HEAD已变化，放弃合并: {merge_error}")
+                    return {
+                        'success': False,
+                        'error': f'源分支HEAD已变化，放弃合并: {merge_error}',
+                        'expected_sha': merge_data['sha']
+                    }
+
                 self.logger.error(f"合并调用失败: {merge_error}")
 
                 # 尝试获取更详细的错误信息
@@ -1158,12 +1375,7 @@ class GitLabClient:
                     }
 
             # 格式化返回结果
-            # 刷新MR状态获取最新信息
-            try:
-                mr = project.mergerequests.get(merge_request_iid)
-            except Exception as final_refresh_error:
-                self.logger.warning(f"最终刷新MR状态失败: {final_refresh_error}")
-
+            # merge() 已用接口返回的最新MR数据更新 mr 对象，无需再次获取
             return_data = {
                 'success': True,
                 'iid': mr.iid,
@@ -1172,7 +1384,7 @@ class GitLabClient:
                 'merged_at': mr.merged_at if hasattr(mr, 'merged_at') else None,
                 'state': mr.state,
                 'web_url': mr.web_url if hasattr(mr, 'web_url') else None,
-                'message': '合并成功'
+                'message': '合并成功' if mr.state == 'merged' else '已设置流水线成功后自动合并'
             }
 
             # 如果result有额外信息，也包含进去
@@ -1182,7 +1394,10 @@ class GitLabClient:
                 return_data['merged_at'] = result.merged_at
                 return_data['merge_sha'] = getattr(result, 'sha', None)
 
-            self.logger.info(f"合并成功: !{mr.iid} -> {mr.target_branch}")
+            if mr.state == 'merged':
+                self.logger.info(f"合并成功: !{mr.iid} -> {mr.target_branch}")
+            else:
+                self.logger.info(f"已设置流水线成功后自动合并: !{mr.iid} -> {mr.target_branch}")
             return return_data
 
         except Exception as e:
@@ -9,28 +9,62 @@ import json
 import logging
 import argparse
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, TextIO
 import colorlog
 
-def setup_logging(level: str = "INFO", use_color: bool = True) -> logging.Logger:
+# LogRecord 自带的属性，其余属性视为通过 extra 传入的结构化字段
+_LOG_RECORD_ATTRS = frozenset(logging.LogRecord('', 0, '', 0, '', (), None).__dict__) | {'message', 'asctime'}
+
+
+class JsonLogFormatter(logging.Formatter):
+    """JSON日志格式，每条记录一行，包含通过 extra 传入的字段"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': self.formatTime(record, '%Y-%m-%d %H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _LOG_RECORD_ATTRS:
+                data[key] = value
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def setup_logging(level: str = "INFO", use_color: bool = True,
+                  json_format: Optional[bool] = None,
+                  stream: Optional[TextIO] = None) -> logging.Logger:
     """
     设置彩色日志
     
     Args:
         level: 日志级别 (DEBUG, INFO, WARNING, ERROR)
         use_color: 是否使用彩色输出
+        json_format: 是否输出JSON格式日志，为None时沿用当前配置
+        stream: 日志输出流，为None时沿用当前配置（默认标准输出）
     
     Returns:
         配置好的logger对象
     """
     logger = logging.getLogger()
     
+    if json_format is None:
+        json_format = any(isinstance(h.formatter, JsonLogFormatter) for h in logger.handlers)
+    
+    if stream is None:
+        stream = next((h.stream for h in logger.handlers if type(h) is logging.StreamHandler), sys.stdout)
+    
     if logger.handlers:
         logger.handlers.clear()
     
     logger.setLevel(getattr(logging, level.upper()))
     
-    if use_color:
+    if json_format:
+        formatter = JsonLogFormatter()
+    elif use_color:
         formatter = colorlog.ColoredFormatter(
             '%(log_color)s%(asctime)s [%(levelname)s] %(message)s%(reset)s',
             datefmt='%Y-%m-%d %H:%M:%S',
@@ -48,7 +82,7 @@ def setup_logging(level: str = "INFO", use_color: bool = True) -> logging.Logger
             datefmt='%Y-%m-%d %H:%M:%S'
         )
     
-    handler = logging.StreamHandler(sys.stdout)
+    handler = logging.StreamHandler(stream)
     handler.setFormatter(formatter)
     logger.addHandler(handler)
     